@@ -0,0 +1,35 @@
+"""
+Shared HTTP helpers for the local probe scripts (health_check.py, test_frontend_integration.py)
+One pooled keep-alive session and one JSON codec, imported once per process
+"""
+
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional fast JSON codec; falls back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BASE_URL = "http://localhost:8000"
+ANALYZE_URL = f"{BASE_URL}/analyze-symptoms"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# One pooled keep-alive session shared by every probe in the process
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=16))
+SESSION.headers["Connection"] = "keep-alive"
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj) if ORJSON_AVAILABLE else json.dumps(obj).encode()
+
+def loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def post_symptoms(text: str, timeout: float = 30) -> requests.Response:
+    """POST a symptom description to the analyze endpoint over the shared session"""
+    return SESSION.post(ANALYZE_URL, data=dumps({"symptoms": text}), headers=JSON_HEADERS, timeout=timeout)
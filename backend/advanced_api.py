@@ -3,20 +3,30 @@ Advanced API endpoints for enhanced medical symptom checker
 """
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict, Optional
 import asyncio
 from datetime import datetime, timedelta
 import json
 
 from .medical_ai_enhancements import AdvancedSymptomAnalyzer, SymptomTriageSystem
-from .user_management import UserManager, SymptomHistoryAnalyzer, get_db
+from .user_management import UserManager, SymptomHistoryAnalyzer, PrivacyManager, get_db
 from .main import app
 
 # Initialize advanced components
 advanced_analyzer = AdvancedSymptomAnalyzer()
 triage_system = SymptomTriageSystem()
 
+# Same cap as /analyze-symptoms/batch
+MAX_BULK_SIZE = 32
+
+class BulkSymptomRequest(BaseModel):
+    symptoms: List[Annotated[str, Field(min_length=1, max_length=2000)]] = Field(
+        ..., min_length=1, max_length=MAX_BULK_SIZE
+    )
+
 @app.post("/api/analyze-symptoms-advanced")
 async def analyze_symptoms_advanced(
     symptom_data: dict,
@@ -28,7 +38,7 @@ async def analyze_symptoms_advanced(
     """
     try:
         # Perform advanced analysis
-        analysis = advanced_analyzer.analyze_symptoms_advanced(
+        analysis = await advanced_analyzer.analyze_symptoms_advanced_async(
             symptom_data['symptoms'],
             symptom_data.get('age'),
             symptom_data.get('gender')
@@ -89,6 +99,42 @@ async def analyze_symptoms_advanced(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Advanced analysis failed: {str(e)}")
 
+@app.post("/api/analyze-symptoms-bulk")
+async def analyze_symptoms_bulk(bulk_data: BulkSymptomRequest):
+    """
+    Analyze several symptom descriptions at once (e.g. history review)
+    """
+    try:
+        analyses = await asyncio.to_thread(advanced_analyzer.analyze_batch, bulk_data.symptoms)
+        
+        results = []
+        for analysis in analyses:
+            triage = triage_system.triage_symptoms(analysis)
+            results.append({
+                "advanced_analysis": {
+                    "primary_symptoms": analysis.primary_symptoms,
+                    "secondary_symptoms": analysis.secondary_symptoms,
+                    "body_systems": analysis.body_systems,
+                    "urgency_score": analysis.urgency_score,
+                    "severity_indicators": analysis.severity_indicators,
+                    "duration": analysis.duration
+                },
+                "triage_assessment": {
+                    "level": triage['triage_level'],
+                    "priority": triage['priority'],
+                    "recommended_action": triage['recommended_action'],
+                    "color_code": triage['color_code']
+                }
+            })
+        
+        return {
+            "results": results,
+            "disclaimer": "This advanced analysis is for informational purposes only."
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk analysis failed: {str(e)}")
+
 @app.get("/api/health-dashboard/{user_uuid}")
 async def get_health_dashboard(user_uuid: str, db: Session = Depends(get_db)):
     """
@@ -328,6 +374,17 @@ async def submit_symptom_feedback(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Feedback submission failed: {str(e)}")
 
+@app.get("/api/data-export/{user_uuid}")
+async def export_user_data(user_uuid: str, db: Session = Depends(get_db)):
+    """
+    Stream the user's data export (GDPR) as JSON
+    """
+    user = UserManager(db).get_user_by_uuid(user_uuid)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return StreamingResponse(PrivacyManager.stream_data_export(user, db), media_type="application/json")
+
 # Helper functions
 def map_triage_to_severity(triage_level: str) -> str:
     """Map triage level to standard severity"""
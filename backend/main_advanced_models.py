@@ -13,18 +13,6 @@ import logging
 from datetime import datetime
 import traceback
 
-def get_cached_model_info() -> Dict[str, bool]:
-    """Get information about which models are cached"""
-    models_to_check = {
-        "d4data/biomedical-ner-all": "biomedical_ner",
-        "emilyalsentzer/Bio_ClinicalBERT": "clinical_bert", 
-        "microsoft/biogpt": "biogpt",
-        "microsoft/BiomedNLP-PubMedBERT-base-uncached-abstract-fulltext": "pubmed_bert",
-        "distilbert-base-uncased": "symptom_classifier",
-        "facebook/bart-large-mnli": "zero_shot_classifier",
-        "cardiffnlp/twitter-roberta-base-sentiment-latest": "sentiment_analyzer",
-        "sentence-transformers/all-MiniLM-L6-v2": "text_embedder"
-    }
 import asyncio
 import threading
 import time
@@ -54,6 +42,16 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared zero-shot classifier: one in-memory instance, also served to local scripts at /classify
+try:
+    from zero_shot_classifier import (
+        ZERO_SHOT_MODEL, EmbeddingZeroShotClassifier, NLIZeroShotClassifier, classify_symptoms, get_classifier
+    )
+    ZERO_SHOT_AVAILABLE = True
+except ImportError as e:
+    ZERO_SHOT_AVAILABLE = False
+    logger.warning(f"⚠️ Zero-shot classifier module not available: {e}")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Advanced Medical AI Platform",
@@ -288,19 +286,24 @@ def load_text_embedder():
         logger.warning(f"⚠️ Text Embedder failed to load: {e}")
 
 def load_zero_shot_classifier():
-    """Load BART-based zero-shot classification model for symptom categorization"""
+    """Load the shared zero-shot classifier (zero_shot_classifier.get_classifier) for symptom categorization"""
     global MODEL_STATUS, MODELS
     try:
-        if not TRANSFORMERS_AVAILABLE:
-            raise ImportError("Transformers not available")
+        if not ZERO_SHOT_AVAILABLE:
+            raise ImportError("Zero-shot classifier not available")
             
-        model_name = "facebook/bart-large-mnli"
-        if is_model_cached(model_name):
+        if is_model_cached(ZERO_SHOT_MODEL):
             logger.info("🎯 Loading cached Zero-Shot Classifier...")
         else:
             logger.info("🎯 Loading Zero-Shot Classifier (will download)...")
         
-        MODELS["zero_shot_classifier"] = transformers_pipeline("zero-shot-classification", model=model_name)
+        classifier = get_classifier()
+        if classifier is None:
+            raise RuntimeError("No zero-shot classifier could be loaded")
+        if not isinstance(classifier, (NLIZeroShotClassifier, EmbeddingZeroShotClassifier)):
+            # get_classifier fell back to a sentiment model, whose labels are not medical categories
+            raise RuntimeError("Only the sentiment fallback loaded; it cannot score symptom categories")
+        MODELS["zero_shot_classifier"] = classifier
         MODEL_STATUS["zero_shot_classifier"] = True
         logger.info("✅ Zero-Shot Classifier loaded successfully")
     except Exception as e:
@@ -352,6 +355,8 @@ def get_cached_model_info() -> Dict[str, bool]:
         "cardiffnlp/twitter-roberta-base-sentiment-latest": "sentiment_analyzer",
         "sentence-transformers/all-MiniLM-L6-v2": "text_embedder"
     }
+    if ZERO_SHOT_AVAILABLE:
+        models_to_check[ZERO_SHOT_MODEL] = "zero_shot_classifier"
     
     cached_status = {}
     for model_path, model_key in models_to_check.items():
@@ -443,6 +448,10 @@ class SymptomRequest(BaseModel):
     current_medications: Optional[str] = None
     severity_self_assessment: Optional[int] = Field(None, ge=1, le=10)
 
+class ClassifyRequest(BaseModel):
+    symptoms: str = Field(..., min_length=1, max_length=2000)
+    top_k: int = Field(3, ge=1, le=12)
+
 class ModelAnalysis(BaseModel):
     model_name: str
     analysis: str
@@ -780,7 +789,7 @@ def analyze_urgency(text: str) -> int:
         logger.error(f"Urgency analysis failed: {e}")
         return 5  # Default moderate urgency
 
-async def analyze_with_openai(symptom_data: SymptomRequest) -> ModelAnalysis:
+def analyze_with_openai(symptom_data: SymptomRequest) -> ModelAnalysis:
     """Analyze symptoms using OpenAI GPT"""
     if not MODEL_STATUS["openai"]:
         return None
@@ -834,6 +843,11 @@ async def analyze_symptoms_advanced(symptom_data: SymptomRequest):
     """
     Advanced multi-model symptom analysis
     """
+    # The model pipelines and the OpenAI client are synchronous; run them off the event loop
+    return await asyncio.to_thread(run_advanced_analysis, symptom_data)
+
+def run_advanced_analysis(symptom_data: SymptomRequest) -> AdvancedAnalysisResponse:
+    """Run every available model over one symptom description (blocking)"""
     try:
         start_time = time.time()
         logger.info(f"🔍 Starting advanced analysis for: {symptom_data.symptoms[:50]}...")
@@ -871,7 +885,7 @@ async def analyze_symptoms_advanced(symptom_data: SymptomRequest):
             model_analyses.append(disease_analysis)
         
         # OpenAI analysis
-        openai_analysis = await analyze_with_openai(symptom_data)
+        openai_analysis = analyze_with_openai(symptom_data)
         if openai_analysis:
             model_analyses.append(openai_analysis)
         
@@ -1003,6 +1017,35 @@ async def analyze_symptoms_advanced(symptom_data: SymptomRequest):
             ai_models_used="❌ AI Analysis Unavailable: System error occurred"
         )
 
+@app.post("/classify")
+async def classify_symptom_categories(request: ClassifyRequest):
+    """
+    Zero-shot symptom category classification using the server's already-loaded classifier
+    """
+    if not MODEL_STATUS.get("zero_shot_classifier"):
+        raise HTTPException(status_code=503, detail="Zero-shot classifier not loaded")
+    
+    result = await asyncio.to_thread(
+        classify_symptoms, MODELS["zero_shot_classifier"], request.symptoms, None, request.top_k
+    )
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+MAX_BATCH_SIZE = 32
+
+@app.post("/analyze-symptoms/batch", response_model=List[AdvancedAnalysisResponse])
+async def analyze_symptoms_batch(symptom_batch: List[SymptomRequest]):
+    """
+    Analyze several symptom descriptions in one request; results keep the request order
+    """
+    if not symptom_batch or len(symptom_batch) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"Batch must contain 1-{MAX_BATCH_SIZE} symptom requests")
+    # Each analysis runs on its own worker thread, so batch items overlap instead of running in turn
+    return await asyncio.gather(
+        *(asyncio.to_thread(run_advanced_analysis, symptom_data) for symptom_data in symptom_batch)
+    )
+
 if __name__ == "__main__":
     import uvicorn
     logger.info("🚀 Starting Advanced Medical AI Platform...")
@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any, Union
 import openai
 import os
+import functools
 from dotenv import load_dotenv
 import json
 import logging
@@ -15,6 +16,8 @@ import importlib.util
 import requests
 import asyncio
 import aiohttp
+from collections import OrderedDict
+from ner_config import BIOMEDICAL_NER_MODEL
 
 # Load environment variables
 load_dotenv()
@@ -60,13 +63,17 @@ except Exception as e:
     OPENAI_AVAILABLE = False
 
 # Hugging Face API Configuration
-HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/d4data/biomedical-ner-all"
+HUGGINGFACE_API_URL = f"https://api-inference.huggingface.co/models/{BIOMEDICAL_NER_MODEL}"
 HUGGINGFACE_TOKEN = os.getenv("HUGGINGFACE_TOKEN", "your_huggingface_token_here")
 HUGGINGFACE_HEADERS = {
     "Authorization": f"Bearer {HUGGINGFACE_TOKEN}",
     "Content-Type": "application/json"
 }
 
+# Successful NER extractions keyed by (model, symptom text), least recently used first
+NER_CACHE_SIZE = 4096
+_ner_cache = OrderedDict()
+
 # Initialize AI Models (load in background to avoid blocking)
 BIOMEDICAL_NER_AVAILABLE = True  # Always available via API
 MEDICAL_BERT_AVAILABLE = False
@@ -149,8 +156,9 @@ SYMPTOM_CONDITIONS_DB = {
     }
 }
 
+@functools.lru_cache(maxsize=1)
 def load_biomedical_model():
-    """Biomedical NER is now available via Hugging Face API"""
+    """Biomedical NER is now available via Hugging Face API (configured once; repeat calls are no-ops)"""
     global BIOMEDICAL_NER_AVAILABLE
     logger.info("Biomedical NER model available via Hugging Face API")
     BIOMEDICAL_NER_AVAILABLE = True
@@ -851,6 +859,13 @@ async def extract_medical_entities(symptoms_text: str) -> Dict[str, List[str]]:
     """Extract medical entities from symptoms using Hugging Face biomedical NER API"""
     try:
         if BIOMEDICAL_NER_AVAILABLE:
+            # Identical symptom strings (retries, repeated prompts) skip the API round-trip
+            cache_key = (BIOMEDICAL_NER_MODEL, symptoms_text)
+            cached = _ner_cache.get(cache_key)
+            if cached is not None:
+                _ner_cache.move_to_end(cache_key)
+                return {"entities": list(cached)}
+            
             try:
                 # Call Hugging Face API
                 entities_result = await call_huggingface_ner_api(symptoms_text)
@@ -889,7 +904,11 @@ async def extract_medical_entities(symptoms_text: str) -> Dict[str, List[str]]:
                             filtered_entities.append(entity)
                     
                     if filtered_entities:
-                        return {"entities": filtered_entities[:10]}  # Limit to top 10 entities
+                        top_entities = filtered_entities[:10]  # Limit to top 10 entities
+                        _ner_cache[cache_key] = tuple(top_entities)
+                        if len(_ner_cache) > NER_CACHE_SIZE:
+                            _ner_cache.popitem(last=False)
+                        return {"entities": top_entities}
                 
             except Exception as e:
                 logger.warning(f"Hugging Face NER API failed: {e}, using rule-based extraction")
@@ -3,11 +3,27 @@ Advanced Medical AI Enhancements for Symptom Checker
 """
 
 from typing import List, Dict, Optional
-import spacy
-import datetime
+import asyncio
+import bisect
+import copy
+import functools
 from dataclasses import dataclass
 from transformers import pipeline
-import pandas as pd
+
+# advanced_api loads this module as part of the backend package; scripts import it top-level
+try:
+    from .ner_config import BIOMEDICAL_NER_MODEL
+except ImportError:
+    from ner_config import BIOMEDICAL_NER_MODEL
+
+def normalize_symptom_text(text: str) -> str:
+    """Normalize symptom text so trivial variations share cache entries"""
+    # Case is kept: the result is also what the NER model sees, and cased checkpoints need it
+    return text.strip()
+
+def _prep(text: str) -> str:
+    """Case-fold text once for keyword matching (safer than lower() for non-ASCII)"""
+    return text.casefold()
 
 @dataclass
 class SymptomAnalysis:
@@ -24,65 +40,75 @@ class MedicalNLPProcessor:
     """Advanced natural language processing for medical text"""
     
     def __init__(self):
-        try:
-            # Load medical NLP model
-            self.nlp = spacy.load("en_core_sci_sm")  # Medical spaCy model
-        except:
-            self.nlp = spacy.load("en_core_web_sm")  # Fallback to general model
-        
         # Medical entity recognition - Use the high-level pipeline helper
-        self.medical_ner = pipeline("token-classification", model="d4data/biomedical-ner-all")
+        self.medical_ner = pipeline("token-classification", model=BIOMEDICAL_NER_MODEL)
         
         # Symptom severity classifier
         self.severity_classifier = pipeline(
             "text-classification",
             model="michiyasunaga/BioLinkBERT-base"
         )
+        
+        # Cache NER results per instance; repeated submissions skip inference
+        self._cached_entities = functools.lru_cache(maxsize=1024)(self._extract_medical_entities_impl)
 
     def extract_medical_entities(self, text: str) -> Dict:
         """Extract medical entities from symptom description"""
         try:
-            entities = self.medical_ner(text)
-            
-            symptoms = []
-            body_parts = []
-            conditions = []
-            medications = []
-            
-            for entity in entities:
-                # Handle the token classification output format
-                label = entity.get('entity', entity.get('entity_group', ''))
-                word = entity.get('word', '')
-                
-                # Clean up subword tokens (remove ## prefix)
-                if word.startswith('##'):
-                    word = word[2:]
-                
-                # Group entities by medical category
-                if label in ['B-SIGN_SYMPTOM', 'I-SIGN_SYMPTOM', 'B-DISEASE_DISORDER', 'I-DISEASE_DISORDER']:
-                    if word and len(word) > 2:  # Filter out short tokens
-                        symptoms.append(word)
-                elif label in ['B-BODY_PART', 'I-BODY_PART', 'B-ORGAN', 'I-ORGAN']:
-                    if word and len(word) > 2:
-                        body_parts.append(word)
-                elif label in ['B-MEDICATION', 'I-MEDICATION', 'B-DRUG', 'I-DRUG']:
-                    if word and len(word) > 2:
-                        medications.append(word)
-                    
-            return {
-                'symptoms': list(set(symptoms)),  # Remove duplicates
-                'body_parts': list(set(body_parts)),
-                'conditions': list(set(conditions)),
-                'medications': list(set(medications))
-            }
+            return copy.deepcopy(self._cached_entities(normalize_symptom_text(text)))
         except Exception as e:
             print(f"Medical NER extraction error: {e}")
             return {'symptoms': [], 'body_parts': [], 'conditions': [], 'medications': []}
 
-    def analyze_temporal_patterns(self, text: str) -> Dict:
-        """Extract temporal information about symptoms"""
-        doc = self.nlp(text)
+    def extract_medical_entities_batch(self, texts: List[str], batch_size: int = 64) -> List[Dict]:
+        """Extract medical entities for many descriptions with one batched NER call"""
+        try:
+            raw_batches = self.medical_ner(texts, batch_size=batch_size)
+        except Exception as e:
+            print(f"Medical NER extraction error: {e}")
+            return [{'symptoms': [], 'body_parts': [], 'conditions': [], 'medications': []} for _ in texts]
+        return [self._group_entities(entities) for entities in raw_batches]
+
+    def _extract_medical_entities_impl(self, text: str) -> Dict:
+        """Run the NER model and group entities (uncached)"""
+        return self._group_entities(self.medical_ner(text))
+
+    def _group_entities(self, entities: List[Dict]) -> Dict:
+        """Group raw token-classification output by medical category"""
+        symptoms = []
+        body_parts = []
+        conditions = []
+        medications = []
         
+        for entity in entities:
+            # Handle the token classification output format
+            label = entity.get('entity', entity.get('entity_group', ''))
+            word = entity.get('word', '')
+            
+            # Clean up subword tokens (remove ## prefix)
+            if word.startswith('##'):
+                word = word[2:]
+            
+            # Group entities by medical category
+            if label in ['B-SIGN_SYMPTOM', 'I-SIGN_SYMPTOM', 'B-DISEASE_DISORDER', 'I-DISEASE_DISORDER']:
+                if word and len(word) > 2:  # Filter out short tokens
+                    symptoms.append(word)
+            elif label in ['B-BODY_PART', 'I-BODY_PART', 'B-ORGAN', 'I-ORGAN']:
+                if word and len(word) > 2:
+                    body_parts.append(word)
+            elif label in ['B-MEDICATION', 'I-MEDICATION', 'B-DRUG', 'I-DRUG']:
+                if word and len(word) > 2:
+                    medications.append(word)
+                
+        return {
+            'symptoms': list(set(symptoms)),  # Remove duplicates
+            'body_parts': list(set(body_parts)),
+            'conditions': list(set(conditions)),
+            'medications': list(set(medications))
+        }
+
+    def analyze_temporal_patterns(self, text: str, text_lower: Optional[str] = None) -> Dict:
+        """Extract temporal information about symptoms"""
         time_patterns = {
             'acute': ['sudden', 'suddenly', 'immediate', 'rapid'],
             'chronic': ['weeks', 'months', 'years', 'chronic', 'persistent'],
@@ -91,7 +117,8 @@ class MedicalNLPProcessor:
         }
         
         temporal_info = {}
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = _prep(text)
         
         for pattern_type, keywords in time_patterns.items():
             if any(keyword in text_lower for keyword in keywords):
@@ -105,6 +132,7 @@ class AdvancedSymptomAnalyzer:
     def __init__(self):
         self.nlp_processor = MedicalNLPProcessor()
         self.medical_knowledge = self._load_medical_knowledge()
+        self._cached_analysis = functools.lru_cache(maxsize=1024)(self._analyze_symptoms_impl)
         
     def _load_medical_knowledge(self) -> Dict:
         """Load medical knowledge base"""
@@ -130,21 +158,42 @@ class AdvancedSymptomAnalyzer:
     
     def analyze_symptoms_advanced(self, symptom_text: str, age: Optional[int] = None, gender: Optional[str] = None) -> SymptomAnalysis:
         """Perform advanced symptom analysis"""
-        
+        # Results are cached by normalized input; hand out copies so callers can't corrupt the cache
+        return copy.deepcopy(self._cached_analysis(normalize_symptom_text(symptom_text), age, gender))
+    
+    async def analyze_symptoms_advanced_async(self, symptom_text: str, age: Optional[int] = None, gender: Optional[str] = None) -> SymptomAnalysis:
+        """Run analyze_symptoms_advanced off the event loop so concurrent requests overlap"""
+        return await asyncio.to_thread(self.analyze_symptoms_advanced, symptom_text, age, gender)
+    
+    def _analyze_symptoms_impl(self, symptom_text: str, age: Optional[int], gender: Optional[str]) -> SymptomAnalysis:
+        """Run the full analysis pipeline (uncached)"""
         # Extract medical entities
         entities = self.nlp_processor.extract_medical_entities(symptom_text)
+        return self._build_analysis(symptom_text, entities)
+    
+    def analyze_batch(self, texts: List[str]) -> List[SymptomAnalysis]:
+        """Analyze many symptom descriptions, sharing one batched NER pass"""
+        normalized = [normalize_symptom_text(text) for text in texts]
+        unique_texts = list(dict.fromkeys(normalized))
+        entities = dict(zip(unique_texts, self.nlp_processor.extract_medical_entities_batch(unique_texts)))
+        analyses = {text: self._build_analysis(text, entities[text]) for text in unique_texts}
+        return [copy.deepcopy(analyses[text]) for text in normalized]
+    
+    def _build_analysis(self, symptom_text: str, entities: Dict) -> SymptomAnalysis:
+        """Derive the analysis from the text and its extracted entities"""
+        text_lower = _prep(symptom_text)
         
         # Analyze temporal patterns
-        temporal = self.nlp_processor.analyze_temporal_patterns(symptom_text)
+        temporal = self.nlp_processor.analyze_temporal_patterns(symptom_text, text_lower)
         
         # Calculate urgency score
-        urgency_score = self._calculate_urgency_score(symptom_text, entities)
+        urgency_score = self._calculate_urgency_score(text_lower, entities)
         
         # Identify body systems
         body_systems = self._identify_body_systems(entities['body_parts'] + entities['symptoms'])
         
         # Severity analysis
-        severity_indicators = self._analyze_severity(symptom_text)
+        severity_indicators = self._analyze_severity(text_lower)
         
         return SymptomAnalysis(
             primary_symptoms=entities['symptoms'][:3],  # Top 3 symptoms
@@ -156,10 +205,9 @@ class AdvancedSymptomAnalyzer:
             confidence=0.85  # Base confidence
         )
     
-    def _calculate_urgency_score(self, text: str, entities: Dict) -> float:
-        """Calculate urgency score based on symptoms"""
+    def _calculate_urgency_score(self, text_lower: str, entities: Dict) -> float:
+        """Calculate urgency score based on symptoms (expects case-folded text)"""
         score = 0.0
-        text_lower = text.lower()
         
         # Check for red flag symptoms
         for red_flag in self.medical_knowledge['red_flags']:
@@ -180,18 +228,17 @@ class AdvancedSymptomAnalyzer:
     def _identify_body_systems(self, terms: List[str]) -> List[str]:
         """Identify affected body systems"""
         systems = []
-        terms_lower = [term.lower() for term in terms]
+        terms_lower = _prep(' '.join(terms))
         
         for system, keywords in self.medical_knowledge['body_systems'].items():
-            if any(keyword in ' '.join(terms_lower) for keyword in keywords):
+            if any(keyword in terms_lower for keyword in keywords):
                 systems.append(system)
                 
         return systems
     
-    def _analyze_severity(self, text: str) -> List[str]:
-        """Analyze severity indicators"""
+    def _analyze_severity(self, text_lower: str) -> List[str]:
+        """Analyze severity indicators (expects case-folded text)"""
         indicators = []
-        text_lower = text.lower()
         
         for severity, words in self.medical_knowledge['symptom_severity'].items():
             if any(word in text_lower for word in words):
@@ -221,19 +268,15 @@ class SymptomTriageSystem:
         'self_care': {'color': 'blue', 'priority': 5, 'action': 'Monitor and self-care'}
     }
     
+    # Urgency score cut-offs (ascending) and the level each bin maps to
+    TRIAGE_THRESHOLDS = [0.2, 0.4, 0.6, 0.8]
+    TRIAGE_ORDER = ['self_care', 'routine', 'semi_urgent', 'urgent', 'emergency']
+    
     def triage_symptoms(self, analysis: SymptomAnalysis) -> Dict:
         """Perform medical triage based on symptom analysis"""
         
-        if analysis.urgency_score >= 0.8:
-            level = 'emergency'
-        elif analysis.urgency_score >= 0.6:
-            level = 'urgent'
-        elif analysis.urgency_score >= 0.4:
-            level = 'semi_urgent'
-        elif analysis.urgency_score >= 0.2:
-            level = 'routine'
-        else:
-            level = 'self_care'
+        # Scores on a threshold belong to the higher level, hence bisect_right
+        level = self.TRIAGE_ORDER[bisect.bisect_right(self.TRIAGE_THRESHOLDS, analysis.urgency_score)]
             
         return {
             'triage_level': level,
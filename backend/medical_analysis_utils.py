@@ -14,6 +14,17 @@ from pydantic import BaseModel
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Models are loaded (and rebound) in the background by main_simplified, so keep a
+# handle on the module and read its attributes at call time instead of copying them.
+try:
+    import main_simplified as _models
+except ImportError as e:
+    logger.warning(f"main_simplified unavailable, AI-backed helpers disabled: {e}")
+    _models = None
+
+# Pipeline failures plus malformed/empty outputs; any of these falls back to the default result
+_PIPELINE_ERRORS = (RuntimeError, ValueError, IndexError, KeyError, TypeError, AttributeError)
+
 # Common medical condition categories
 SYMPTOM_CATEGORIES = [
     "Cardiovascular", "Respiratory", "Gastrointestinal", "Neurological", 
@@ -32,6 +43,21 @@ COMMON_CONDITIONS = [
     "Rosacea", "Hypothyroidism", "Diabetes", "Anemia"
 ]
 
+# Lowercased condition lookup and a single-pass matcher for direct mentions
+_CONDITION_LOWER = {condition.lower(): condition for condition in COMMON_CONDITIONS}
+_CONDITION_PATTERN = re.compile("|".join(re.escape(condition) for condition in _CONDITION_LOWER))
+
+# Symptom pattern rules: (keyword groups, condition, severity override).
+# Every group must match, and a group matches when any of its keywords appears.
+_SYMPTOM_RULES = [
+    ((("head",), ("ache",)), "Possible Headache or Migraine", None),
+    ((("stomach", "abdomen"), ("pain",)), "Possible Gastrointestinal Issue", None),
+    ((("throat",), ("sore", "pain")), "Possible Upper Respiratory Infection", None),
+    # Chest pain should be taken seriously
+    ((("chest",), ("pain",)), "Possible Cardiovascular or Respiratory Issue", "High"),
+    ((("rash", "itch"), ("skin", "body")), "Possible Skin Condition or Allergic Reaction", None),
+]
+
 # Severity to numerical score mapping
 SEVERITY_MAPPING = {
     "low": 2,
@@ -49,22 +75,21 @@ def extract_medical_entities(text: str) -> Dict[str, List[str]]:
     """
     Extract medical entities from text using biomedical NER model
     """
-    from main_simplified import biomedical_ner, BIOMEDICAL_NER_AVAILABLE
-    
-    if not BIOMEDICAL_NER_AVAILABLE or not biomedical_ner:
+    biomedical_ner = getattr(_models, "biomedical_ner", None) if _models else None
+    if not biomedical_ner or not _models.BIOMEDICAL_NER_AVAILABLE:
         return {"entities": []}
     
+    # Process entities
+    symptoms = []
+    body_parts = []
+    diseases = []
+    treatments = []
+    severity_indicators = []
+    
     try:
         # Extract entities
         raw_entities = biomedical_ner(text)
         
-        # Process entities
-        symptoms = []
-        body_parts = []
-        diseases = []
-        treatments = []
-        severity_indicators = []
-        
         # Group entities by type and deduplicate
         for entity in raw_entities:
             word = entity.get('word', '').lower()
@@ -88,47 +113,43 @@ def extract_medical_entities(text: str) -> Dict[str, List[str]]:
             elif word in SEVERITY_MAPPING:
                 if word not in severity_indicators:
                     severity_indicators.append(word)
-        
-        # Create a consolidated list of entities
-        all_entities = symptoms + body_parts + diseases
-        
-        # Filter out duplicates and very short entities
-        filtered_entities = []
-        for entity in all_entities:
-            if len(entity) > 2 and entity not in filtered_entities:
-                filtered_entities.append(entity)
-        
-        return {
-            "entities": filtered_entities,
-            "symptoms": symptoms,
-            "body_parts": body_parts,
-            "diseases": diseases,
-            "treatments": treatments,
-            "severity_indicators": severity_indicators
-        }
-        
-    except Exception as e:
+    except _PIPELINE_ERRORS as e:
         logger.error(f"Error in extract_medical_entities: {e}")
         return {"entities": []}
+    
+    # Create a consolidated list of entities
+    all_entities = symptoms + body_parts + diseases
+    
+    # Filter out duplicates (order-preserving) and very short entities
+    filtered_entities = [entity for entity in dict.fromkeys(all_entities) if len(entity) > 2]
+    
+    return {
+        "entities": filtered_entities,
+        "symptoms": symptoms,
+        "body_parts": body_parts,
+        "diseases": diseases,
+        "treatments": treatments,
+        "severity_indicators": severity_indicators
+    }
 
 def enhance_with_medical_terminology(entities: List[str]) -> List[str]:
     """
     Enhance entities with professional medical terminology
     """
-    from main_simplified import MEDICAL_TERMS
+    known_terms = _models.MEDICAL_TERMS if _models else {}
     
     medical_terms = []
     
     for entity in entities:
         entity_lower = entity.lower()
         # Add medical term if available
-        if entity_lower in MEDICAL_TERMS:
-            medical_term = MEDICAL_TERMS[entity_lower]
+        if entity_lower in known_terms:
+            medical_term = known_terms[entity_lower]
             if medical_term not in medical_terms:
                 medical_terms.append(f"{entity} ({medical_term})")
         else:
             # Check for partial matches
-            for term, medical_term in MEDICAL_TERMS.items():
+            for term, medical_term in known_terms.items():
                 if term in entity_lower or entity_lower in term:
                     if medical_term not in medical_terms:
                         medical_terms.append(f"{entity} ({medical_term})")
@@ -140,9 +161,8 @@ def classify_symptoms(text: str) -> List[str]:
     """
     Classify symptoms into medical categories
     """
-    from main_simplified import medical_bert, MEDICAL_BERT_AVAILABLE
-    
-    if not MEDICAL_BERT_AVAILABLE or not medical_bert:
+    medical_bert = _models.medical_bert if _models else None
+    if not medical_bert or not _models.MEDICAL_BERT_AVAILABLE:
         return []
     
     try:
@@ -154,59 +174,52 @@ def classify_symptoms(text: str) -> List[str]:
         for idx, score in enumerate(result['scores'][:5]):  # Consider top 5 scores
             if score > 0.15:  # Threshold for relevance
                 relevant_categories.append(result['labels'][idx])
-        
-        return relevant_categories
-    
-    except Exception as e:
+    except _PIPELINE_ERRORS as e:
         logger.error(f"Error in classify_symptoms: {e}")
         return []
+    
+    return relevant_categories
 
 def analyze_symptom_severity(text: str) -> int:
     """
     Analyze the severity of symptoms on a scale of 1-10
     """
-    from main_simplified import symptom_classifier, SYMPTOM_CLASSIFIER_AVAILABLE
+    symptom_classifier = _models.symptom_classifier if _models else None
+    
+    # Check for explicit severity terms
+    text_lower = text.lower()
+    for term, score in SEVERITY_MAPPING.items():
+        if term in text_lower:
+            return score
     
-    if not SYMPTOM_CLASSIFIER_AVAILABLE or not symptom_classifier:
-        # Fallback: basic keyword matching for severity
-        text_lower = text.lower()
-        for term, score in SEVERITY_MAPPING.items():
-            if term in text_lower:
-                return score
+    if not symptom_classifier or not _models.SYMPTOM_CLASSIFIER_AVAILABLE:
         return 5  # Default medium severity
     
     try:
-        # Check for explicit severity terms
-        text_lower = text.lower()
-        for term, score in SEVERITY_MAPPING.items():
-            if term in text_lower:
-                return score
-        
         # Use the classifier to determine sentiment/intensity
         result = symptom_classifier(text)
         
         # Map classifier result to severity score
         label = result[0]['label']
         score = result[0]['score']
-        
-        # DistilBERT typically classifies as POSITIVE/NEGATIVE
-        # We'll interpret NEGATIVE with high confidence as more severe
-        if label == 'NEGATIVE' and score > 0.8:
-            return 8
-        elif label == 'NEGATIVE' and score > 0.6:
-            return 7
-        elif label == 'NEGATIVE':
-            return 6
-        elif label == 'POSITIVE' and score > 0.8:
-            return 3
-        elif label == 'POSITIVE':
-            return 4
-        
-        return 5  # Default medium severity
-        
-    except Exception as e:
+    except _PIPELINE_ERRORS as e:
         logger.error(f"Error in analyze_symptom_severity: {e}")
         return 5  # Default medium severity
+    
+    # DistilBERT typically classifies as POSITIVE/NEGATIVE
+    # We'll interpret NEGATIVE with high confidence as more severe
+    if label == 'NEGATIVE' and score > 0.8:
+        return 8
+    elif label == 'NEGATIVE' and score > 0.6:
+        return 7
+    elif label == 'NEGATIVE':
+        return 6
+    elif label == 'POSITIVE' and score > 0.8:
+        return 3
+    elif label == 'POSITIVE':
+        return 4
+    
+    return 5  # Default medium severity
 
 def create_ensemble_analysis(symptoms: str, entities: List[str], medical_terms: List[str], 
                             symptom_classes: List[str], severity_score: Optional[int] = None, 
@@ -214,7 +227,8 @@ def create_ensemble_analysis(symptoms: str, entities: List[str], medical_terms:
     """
     Create an analysis based on the ensemble of available models
     """
-    from main_simplified import AnalysisResponse
+    # Without main_simplified, return the same fields as a plain dict
+    AnalysisResponse = _models.AnalysisResponse if _models else dict
     
     # Determine severity based on score or default to medium
     severity_mapping = {
@@ -240,30 +254,17 @@ def create_ensemble_analysis(symptoms: str, entities: List[str], medical_terms:
     
     # For more specific condition identification based on symptoms
     symptoms_lower = symptoms.lower()
-    for common_condition in COMMON_CONDITIONS:
-        condition_lower = common_condition.lower()
-        # Check if condition keywords appear in the symptoms
-        if condition_lower in symptoms_lower:
-            condition = f"Possible {common_condition}"
-            break
-        
+    condition_match = _CONDITION_PATTERN.search(symptoms_lower)
+    if condition_match:
+        condition = f"Possible {_CONDITION_LOWER[condition_match.group(0)]}"
+    else:
         # Check for specific symptom patterns
-        if "head" in symptoms_lower and "ache" in symptoms_lower:
-            condition = "Possible Headache or Migraine"
-            break
-        elif ("stomach" in symptoms_lower or "abdomen" in symptoms_lower) and "pain" in symptoms_lower:
-            condition = "Possible Gastrointestinal Issue"
-            break
-        elif "throat" in symptoms_lower and ("sore" in symptoms_lower or "pain" in symptoms_lower):
-            condition = "Possible Upper Respiratory Infection"
-            break
-        elif "chest" in symptoms_lower and "pain" in symptoms_lower:
-            condition = "Possible Cardiovascular or Respiratory Issue"
-            severity = "High"  # Chest pain should be taken seriously
-            break
-        elif ("rash" in symptoms_lower or "itch" in symptoms_lower) and ("skin" in symptoms_lower or "body" in symptoms_lower):
-            condition = "Possible Skin Condition or Allergic Reaction"
-            break
+        for keyword_groups, rule_condition, severity_override in _SYMPTOM_RULES:
+            if all(any(keyword in symptoms_lower for keyword in group) for group in keyword_groups):
+                condition = rule_condition
+                if severity_override:
+                    severity = severity_override
+                break
     
     # Generate appropriate recommendations based on symptom classes and severity
     recommendations = [
@@ -4,18 +4,130 @@ Handles loading, caching, and management of multiple AI models
 """
 
 import os
+import bisect
+import functools
+import glob
+import importlib.util
+import mmap
 import json
+import queue
 import time
 import threading
 import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-import psutil
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+MEMORY_POLL_TTL_SECS = 0.5
+
+# embed() requests arriving within this window are encoded together
+EMBED_BATCH_WINDOW_SECS = 0.005
+EMBED_BATCH_SIZE = 64
+
+# Upper priority bound of each startup tier: critical (1-3), core (4-7), optional (8-10);
+# models in the same tier load concurrently
+PRIORITY_TIER_BOUNDS = (3, 7)
+
+PREFETCH_CHUNK_BYTES = 16 * 1024 * 1024
+# MAP_POPULATE faults the whole mapping into the page cache in one syscall (Linux only)
+_MAP_POPULATE = getattr(mmap, "MAP_POPULATE", None)
+
+def _hf_hub_cache_dir() -> str:
+    """Locate the HuggingFace hub cache directory"""
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+        return HF_HUB_CACHE
+    except ImportError:
+        hf_home = os.getenv("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+        return os.path.join(hf_home, "hub")
+
+def _prefetch_file(path: str) -> None:
+    """Pull a file into the OS page cache without keeping it in Python memory"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    
+    with open(path, "rb") as f:
+        if _MAP_POPULATE is not None:
+            mm = mmap.mmap(f.fileno(), 0, flags=mmap.MAP_PRIVATE | _MAP_POPULATE, prot=mmap.PROT_READ)
+            mm.close()
+        else:
+            while f.read(PREFETCH_CHUNK_BYTES):
+                pass
+
+def _prefetch_snapshot(model_id: str) -> None:
+    """Warm the page cache with a model's cached weight files before it is loaded"""
+    repo_ids = [model_id] if "/" in model_id else [model_id, f"sentence-transformers/{model_id}"]
+    for repo_id in repo_ids:
+        repo_dir = os.path.join(_hf_hub_cache_dir(), "models--" + repo_id.replace("/", "--"))
+        for snapshot in glob.glob(os.path.join(repo_dir, "snapshots", "*")):
+            # The loader reads safetensors when a snapshot has them, so skip the .bin duplicates
+            paths = (glob.glob(os.path.join(snapshot, "*.safetensors")) or
+                     glob.glob(os.path.join(snapshot, "*.bin")))
+            for path in paths:
+                try:
+                    _prefetch_file(path)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Prefetch skipped for {path}: {e}")
+
+def _preimport_model_libraries() -> None:
+    """Import the heavy ML libraries so the first load_model finds them in sys.modules"""
+    for module_name in ("transformers", "sentence_transformers"):
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            logger.debug(f"Background import of {module_name} failed: {e}")
+
+def _default_model_kwargs() -> Dict[str, Any]:
+    """Loader kwargs that mmap safetensors weights instead of copying them into RAM"""
+    kwargs = {"torch_dtype": "auto"}
+    # transformers refuses low_cpu_mem_usage without accelerate installed
+    if importlib.util.find_spec("accelerate") is not None:
+        kwargs["low_cpu_mem_usage"] = True
+    return kwargs
+
+@functools.lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """Check for a usable GPU without requiring torch to be installed (probed once)"""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+def _use_half_precision(dtype: str) -> bool:
+    """FP16 only pays off on GPU; most CPU kernels are slower (or missing) in half precision"""
+    return dtype == "fp16" and _cuda_available()
+
+def _use_bitsandbytes_int8(quantization: Optional[str]) -> bool:
+    """bitsandbytes 8-bit kernels are CUDA-only"""
+    return (quantization == "int8" and _cuda_available() and
+            importlib.util.find_spec("bitsandbytes") is not None)
+
+def _uses_dynamic_int8(config) -> bool:
+    """Whether load_model quantizes this model after loading it in fp32 (the CPU int8 path)"""
+    if config.quantization != "int8":
+        return False
+    if config.model_type == "pipeline":
+        return not _use_bitsandbytes_int8(config.quantization)
+    return not _use_half_precision(config.dtype)
+
+def _load_peak_mb(config) -> int:
+    """Memory to reserve while a model loads: fp32 weights plus the int8 copy when quantizing"""
+    if config.fp32_memory_mb and _uses_dynamic_int8(config):
+        return config.fp32_memory_mb + config.memory_requirement_mb
+    return config.memory_requirement_mb
+
+def _quantize_dynamic_int8(module):
+    """Convert Linear layers to int8 with dynamic activation quantization (CPU inference)"""
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+@dataclass(frozen=True, slots=True)
 class ModelConfig:
     """Configuration for an AI model"""
     name: str
@@ -27,6 +139,10 @@ class ModelConfig:
     priority: int  # 1 (highest) to 10 (lowest)
     enabled: bool = True
     load_on_startup: bool = True
+    model_kwargs: Dict[str, Any] = field(default_factory=_default_model_kwargs)
+    dtype: str = "auto"  # 'auto' or 'fp16' (applied when a GPU is available)
+    quantization: Optional[str] = None  # None or 'int8'; memory_requirement_mb should reflect it
+    fp32_memory_mb: Optional[int] = None  # Unquantized size; held alongside the int8 copy while quantizing
 
 class ModelManager:
     """Advanced model management system"""
@@ -38,6 +154,51 @@ class ModelManager:
         self.model_configs = self._init_model_configs()
         self.max_memory_usage_mb = 8000  # 8GB limit
         self.current_memory_usage_mb = 0
+        # Guards the shared state above; loads run concurrently from a thread pool
+        self.lock = threading.Lock()
+        # Model name -> Event set when its in-flight load finishes, so concurrent callers can wait on it
+        self._loading = {}
+        # Model name -> why its last load attempt failed, for the tier loader's log
+        self._load_failures = {}
+        # Loaded model name -> last access time, oldest first
+        self.lru = OrderedDict()
+        # Models loaded on purpose at startup; the idle sweeper never unloads these
+        self._startup_models = set()
+        # Bounds concurrent loads; can_load_model's memory budget is the other back-pressure signal
+        self.load_sema = threading.BoundedSemaphore(max(2, (os.cpu_count() or 1) // 2))
+        # Per-model status entries reused by get_status; only loaded/loading_progress change
+        self._status_template = {
+            name: {
+                "loaded": False,
+                "config": {
+                    "description": config.description,
+                    "priority": config.priority,
+                    "memory_requirement_mb": config.memory_requirement_mb,
+                    "enabled": config.enabled
+                },
+                "loading_progress": 0
+            }
+            for name, config in self.model_configs.items()
+        }
+        # (monotonic timestamp, available MB) of the last psutil poll
+        self._mem_cache = (0.0, 0)
+        
+        # Overlap the multi-second transformers/sentence_transformers imports with the setup below
+        threading.Thread(target=_preimport_model_libraries, daemon=True, name="model-preimport").start()
+        
+        # Start reading startup models' weights into the page cache while everything else initializes
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="model-prefetch")
+        self._prefetch_futures = {
+            config.model_id: self._prefetch_executor.submit(_prefetch_snapshot, config.model_id)
+            for config in self.model_configs.values()
+            if config.enabled and config.load_on_startup
+        }
+        
+        self._start_idle_sweeper()
+        
+        # (text, Future) pairs waiting to be encoded by the embedder batching thread
+        self._embed_queue = queue.Queue()
+        threading.Thread(target=self._embed_worker, daemon=True, name="model-embed-batcher").start()
         
     def _init_model_configs(self) -> Dict[str, ModelConfig]:
         """Initialize model configurations"""
@@ -75,8 +236,10 @@ class ModelManager:
                 model_type="pipeline",
                 task="zero-shot-classification",
                 description="Classifies symptoms into disease categories",
-                memory_requirement_mb=600,
-                priority=4
+                memory_requirement_mb=150,
+                priority=4,
+                quantization="int8",
+                fp32_memory_mb=600
             ),
             "medical_text_generator": ModelConfig(
                 name="medical_text_generator",
@@ -94,7 +257,8 @@ class ModelManager:
                 task="sentiment-analysis",
                 description="Analyzes symptom severity and urgency from text",
                 memory_requirement_mb=300,
-                priority=6
+                priority=6,
+                dtype="fp16"
             ),
             "medical_qa": ModelConfig(
                 name="medical_qa",
@@ -120,8 +284,11 @@ class ModelManager:
                 model_type="sentence_transformer",
                 task="embedding",
                 description="Creates semantic embeddings for medical text similarity",
-                memory_requirement_mb=200,
-                priority=9
+                memory_requirement_mb=100,  # int8 on CPU, fp16 on GPU
+                priority=9,
+                dtype="fp16",
+                quantization="int8",
+                fp32_memory_mb=200
             ),
             "medical_summarizer": ModelConfig(
                 name="medical_summarizer",
@@ -129,22 +296,33 @@ class ModelManager:
                 model_type="pipeline",
                 task="summarization",
                 description="Summarizes medical information and reports",
-                memory_requirement_mb=600,
-                priority=10
+                memory_requirement_mb=150,
+                priority=10,
+                quantization="int8",
+                fp32_memory_mb=600
             )
         }
         return configs
     
     def get_available_memory_mb(self) -> int:
         """Get available system memory in MB"""
+        # Reuse a recent poll; the tuple is swapped atomically, so a race only costs an extra poll
+        polled_at, available_mb = self._mem_cache
+        now = time.monotonic()
+        if polled_at and now - polled_at < MEMORY_POLL_TTL_SECS:
+            return available_mb
+        
         try:
+            import psutil  # Deferred so importing this module stays cheap
             memory = psutil.virtual_memory()
             available_mb = memory.available // (1024 * 1024)
-            return available_mb
         except Exception:
             return 4000  # Default fallback
+        
+        self._mem_cache = (now, available_mb)
+        return available_mb
     
-    def can_load_model(self, model_name: str) -> bool:
+    def can_load_model(self, model_name: str, memory_needed: Optional[int] = None) -> bool:
         """Check if model can be loaded based on memory constraints"""
         if model_name not in self.model_configs:
             return False
@@ -153,7 +331,8 @@ class ModelManager:
         available_memory = self.get_available_memory_mb()
         
         # Check if we have enough memory
-        memory_needed = config.memory_requirement_mb
+        if memory_needed is None:
+            memory_needed = _load_peak_mb(config)
         total_memory_after_load = self.current_memory_usage_mb + memory_needed
         
         return (available_memory > memory_needed and 
@@ -165,40 +344,84 @@ class ModelManager:
             logger.error(f"Unknown model: {model_name}")
             return False
         
-        if model_name in self.models and self.model_status.get(model_name, False):
-            logger.info(f"Model {model_name} already loaded")
-            return True
+        config = self.model_configs[model_name]
+        # Outside the lock: the CUDA probe behind this imports torch, which takes seconds the first time
+        reserved_mb = _load_peak_mb(config)
         
-        if not self.can_load_model(model_name):
-            logger.warning(f"Cannot load {model_name} - insufficient memory")
-            return False
+        # Reserve the memory budget up front so concurrent loads can't overcommit
+        with self.lock:
+            if model_name in self.models and self.model_status.get(model_name, False):
+                logger.info(f"Model {model_name} already loaded")
+                return True
+            
+            in_flight = self._loading.get(model_name)
+            if in_flight is None:
+                if not self.can_load_model(model_name, reserved_mb):
+                    logger.warning(f"Cannot load {model_name} - insufficient memory")
+                    self._load_failures[model_name] = "insufficient memory"
+                    return False
+                
+                self._loading[model_name] = threading.Event()
+                self.current_memory_usage_mb += reserved_mb
+                self.loading_progress[model_name] = 0
         
-        config = self.model_configs[model_name]
+        if in_flight is not None:
+            # Another thread is loading it; share that load's outcome instead of failing
+            logger.info(f"Model {model_name} is already being loaded, waiting for it")
+            in_flight.wait()
+            return self.model_status.get(model_name, False)
         
         try:
             logger.info(f"🔄 Loading {config.description}...")
-            self.loading_progress[model_name] = 0
             
             start_time = time.time()
             
+            # Let an in-flight prefetch finish so the loader reads from the page cache
+            prefetch = self._prefetch_futures.get(config.model_id)
+            if prefetch is not None:
+                wait([prefetch])
+            
             if config.model_type == "pipeline":
                 from transformers import pipeline
                 self.loading_progress[model_name] = 50
-                model = pipeline(config.task, model=config.model_id)
+                model_kwargs = dict(config.model_kwargs)
+                device = None
+                if _use_bitsandbytes_int8(config.quantization):
+                    from transformers import BitsAndBytesConfig
+                    model_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+                    model_kwargs["device_map"] = "auto"
+                elif _use_half_precision(config.dtype):
+                    import torch
+                    model_kwargs["torch_dtype"] = torch.float16
+                    device = 0
+                model = pipeline(config.task, model=config.model_id, model_kwargs=model_kwargs, device=device)
+                
+                if config.quantization == "int8" and "quantization_config" not in model_kwargs:
+                    model.model = _quantize_dynamic_int8(model.model)
                 
             elif config.model_type == "sentence_transformer":
                 from sentence_transformers import SentenceTransformer
                 self.loading_progress[model_name] = 50
-                model = SentenceTransformer(config.model_id)
+                if _use_half_precision(config.dtype):
+                    model = SentenceTransformer(config.model_id, device="cuda").half()
+                else:
+                    model = SentenceTransformer(config.model_id, device="cpu")
+                    if config.quantization == "int8":
+                        model = _quantize_dynamic_int8(model)
                 
             else:
-                logger.error(f"Unknown model type: {config.model_type}")
-                return False
+                raise ValueError(f"Unknown model type: {config.model_type}")
             
-            self.models[model_name] = model
-            self.model_status[model_name] = True
-            self.current_memory_usage_mb += config.memory_requirement_mb
-            self.loading_progress[model_name] = 100
+            with self.lock:
+                # The fp32 weights are gone once quantized; keep only the steady-state budget
+                self.current_memory_usage_mb -= reserved_mb - config.memory_requirement_mb
+                self.models[model_name] = model
+                self.model_status[model_name] = True
+                self.loading_progress[model_name] = 100
+                self._loading.pop(model_name).set()
+                self._load_failures.pop(model_name, None)
+                self.lru[model_name] = time.monotonic()
+                self.lru.move_to_end(model_name)
             
             load_time = time.time() - start_time
             logger.info(f"✅ {config.name} loaded successfully in {load_time:.2f}s")
@@ -207,22 +430,32 @@ class ModelManager:
             
         except Exception as e:
             logger.error(f"❌ Failed to load {model_name}: {e}")
-            self.model_status[model_name] = False
-            self.loading_progress[model_name] = -1
+            with self.lock:
+                self.current_memory_usage_mb = max(0, self.current_memory_usage_mb - reserved_mb)
+                self.model_status[model_name] = False
+                self.loading_progress[model_name] = -1
+                self._loading.pop(model_name).set()
+                self._load_failures[model_name] = f"load error: {e}"
             return False
     
-    def unload_model(self, model_name: str) -> bool:
-        """Unload a model to free memory"""
+    def unload_model(self, model_name: str, idle_since: Optional[float] = None) -> bool:
+        """Unload a model to free memory; with idle_since, only if it has not been used since then"""
         if model_name not in self.models:
             return True
         
         try:
-            del self.models[model_name]
-            self.model_status[model_name] = False
-            
-            if model_name in self.model_configs:
-                self.current_memory_usage_mb -= self.model_configs[model_name].memory_requirement_mb
-                self.current_memory_usage_mb = max(0, self.current_memory_usage_mb)
+            with self.lock:
+                if model_name not in self.models:
+                    return True
+                if idle_since is not None and self.lru.get(model_name, 0.0) >= idle_since:
+                    return False
+                del self.models[model_name]
+                self.model_status[model_name] = False
+                self.lru.pop(model_name, None)
+                
+                if model_name in self.model_configs:
+                    self.current_memory_usage_mb -= self.model_configs[model_name].memory_requirement_mb
+                    self.current_memory_usage_mb = max(0, self.current_memory_usage_mb)
             
             logger.info(f"🗑️ Unloaded {model_name}")
             return True
@@ -231,47 +464,120 @@ class ModelManager:
             logger.error(f"Failed to unload {model_name}: {e}")
             return False
     
-    def load_models_by_priority(self, max_models: Optional[int] = None) -> List[str]:
-        """Load models in priority order"""
-        # Sort models by priority
-        sorted_models = sorted(
-            self.model_configs.items(),
-            key=lambda x: x[1].priority
-        )
-        
+    def _priority_tiers(self, model_names: List[str]) -> List[List[str]]:
+        """Group model names into PRIORITY_TIER_BOUNDS tiers, highest priority first"""
+        tiers = {}
+        for model_name in sorted(model_names, key=lambda name: self.model_configs[name].priority):
+            tier = bisect.bisect_left(PRIORITY_TIER_BOUNDS, self.model_configs[model_name].priority)
+            tiers.setdefault(tier, []).append(model_name)
+        return [tiers[tier] for tier in sorted(tiers)]
+    
+    def _load_throttled(self, model_name: str) -> bool:
+        """Load a model while holding a slot of the concurrent-load semaphore"""
+        with self.load_sema:
+            return self.load_model(model_name)
+    
+    def _load_in_tiers(self, model_names: List[str], max_models: Optional[int] = None) -> List[str]:
+        """Load models tier by tier; models within a tier load concurrently"""
         loaded_models = []
+        if not model_names:
+            return loaded_models
         
-        for model_name, config in sorted_models:
-            if not config.enabled or not config.load_on_startup:
-                continue
+        max_workers = min(len(model_names), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-loader") as executor:
+            for tier in self._priority_tiers(model_names):
+                if max_models:
+                    remaining = max_models - len(loaded_models)
+                    if remaining <= 0:
+                        break
+                    tier = tier[:remaining]
                 
-            if max_models and len(loaded_models) >= max_models:
-                break
-            
-            if self.load_model(model_name):
-                loaded_models.append(model_name)
-            else:
-                logger.warning(f"Skipping {model_name} due to memory constraints")
+                futures = {executor.submit(self._load_throttled, name): name for name in tier}
+                wait(futures)
+                
+                # Keep priority order within the tier for the returned list
+                for future, model_name in futures.items():
+                    if future.result():
+                        loaded_models.append(model_name)
+                    else:
+                        reason = self._load_failures.get(model_name, "not loaded")
+                        logger.warning(f"Skipping {model_name}: {reason}")
         
         return loaded_models
     
+    def load_models_by_priority(self, max_models: Optional[int] = None) -> List[str]:
+        """Load models in priority order"""
+        model_names = [
+            name for name, config in self.model_configs.items()
+            if config.enabled and config.load_on_startup
+        ]
+        loaded_models = self._load_in_tiers(model_names, max_models)
+        with self.lock:
+            self._startup_models.update(loaded_models)
+        return loaded_models
+    
     def load_models_async(self, model_names: List[str] = None) -> None:
         """Load models asynchronously"""
         if model_names is None:
             model_names = list(self.model_configs.keys())
         
-        def load_worker():
-            for model_name in model_names:
-                if self.model_configs[model_name].enabled:
-                    self.load_model(model_name)
-                    time.sleep(1)  # Prevent overwhelming the system
-        
-        thread = threading.Thread(target=load_worker, daemon=True)
+        model_names = [name for name in model_names if self.model_configs[name].enabled]
+        thread = threading.Thread(target=self._load_in_tiers, args=(model_names,), daemon=True)
         thread.start()
     
     def get_model(self, model_name: str):
         """Get a loaded model"""
-        return self.models.get(model_name)
+        with self.lock:
+            model = self.models.get(model_name)
+            if model is not None:
+                self.lru[model_name] = time.monotonic()
+                self.lru.move_to_end(model_name)
+        return model
+    
+    def _get_embedder(self):
+        """Get the sentence embedder, loading it on first use"""
+        model = self.get_model("embedder")
+        if model is None:
+            if not self.load_model("embedder"):
+                raise RuntimeError("Embedder model could not be loaded")
+            model = self.get_model("embedder")
+        return model
+    
+    def embed_many(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE):
+        """Encode texts in one vectorized call; returns an array of normalized embeddings"""
+        return self._get_embedder().encode(
+            texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+    
+    def embed(self, text: str):
+        """Encode a single text, coalescing with concurrent embed() calls into one batch"""
+        future = Future()
+        self._embed_queue.put((text, future))
+        return future.result()
+    
+    def _embed_worker(self, batch_size: int = EMBED_BATCH_SIZE) -> None:
+        """Drain the embed queue in micro-batches of up to batch_size texts"""
+        while True:
+            batch = [self._embed_queue.get()]
+            deadline = time.monotonic() + EMBED_BATCH_WINDOW_SECS
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._embed_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.embed_many(texts, batch_size=batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
     
     def is_model_loaded(self, model_name: str) -> bool:
         """Check if a model is loaded"""
@@ -279,20 +585,15 @@ class ModelManager:
     
     def get_status(self) -> Dict[str, Any]:
         """Get comprehensive status of all models"""
+        with self.lock:
+            for name, entry in self._status_template.items():
+                entry["loaded"] = self.model_status.get(name, False)
+                entry["loading_progress"] = self.loading_progress.get(name, 0)
+            # Shallow-copy entries so callers never observe later updates; config dicts are static
+            models = {name: entry.copy() for name, entry in self._status_template.items()}
+        
         return {
-            "models": {
-                name: {
-                    "loaded": self.model_status.get(name, False),
-                    "config": {
-                        "description": config.description,
-                        "priority": config.priority,
-                        "memory_requirement_mb": config.memory_requirement_mb,
-                        "enabled": config.enabled
-                    },
-                    "loading_progress": self.loading_progress.get(name, 0)
-                }
-                for name, config in self.model_configs.items()
-            },
+            "models": models,
             "system": {
                 "current_memory_usage_mb": self.current_memory_usage_mb,
                 "max_memory_usage_mb": self.max_memory_usage_mb,
@@ -302,28 +603,61 @@ class ModelManager:
             }
         }
     
+    def _evictable_models(self) -> List[str]:
+        """Loaded models from least to most recently used, excluding pinned priority-1 models"""
+        with self.lock:
+            return [name for name in self.lru if self.model_configs[name].priority != 1]
+    
     def optimize_memory(self) -> List[str]:
-        """Optimize memory usage by unloading low-priority models if needed"""
+        """Optimize memory usage by unloading least recently used models if needed"""
         unloaded = []
         
         if self.current_memory_usage_mb > self.max_memory_usage_mb * 0.8:  # 80% threshold
-            # Sort by priority (highest priority first)
-            sorted_models = sorted(
-                [(name, config) for name, config in self.model_configs.items() 
-                 if self.is_model_loaded(name)],
-                key=lambda x: x[1].priority,
-                reverse=True  # Unload lowest priority first
-            )
-            
-            for model_name, config in sorted_models:
+            for model_name in self._evictable_models():
                 if self.current_memory_usage_mb <= self.max_memory_usage_mb * 0.6:  # 60% target
                     break
                 
-                if config.priority > 5:  # Only unload low-priority models
-                    self.unload_model(model_name)
-                    unloaded.append(model_name)
+                self.unload_model(model_name)
+                unloaded.append(model_name)
         
         return unloaded
+    
+    def evict_idle(self, ttl_secs: float = 300) -> List[str]:
+        """Unload on-demand models that have not been used for ttl_secs, even when under budget"""
+        cutoff = time.monotonic() - ttl_secs
+        with self.lock:
+            idle = [
+                name for name, last_used in self.lru.items()
+                if last_used < cutoff
+                and name not in self._startup_models
+                and self.model_configs[name].priority != 1
+            ]
+        
+        unloaded = []
+        for model_name in idle:
+            # unload_model re-checks the timestamp under the lock, so a model used since the scan stays
+            if self.unload_model(model_name, idle_since=cutoff):
+                unloaded.append(model_name)
+        return unloaded
+    
+    def _start_idle_sweeper(self, interval_secs: float = 60, ttl_secs: float = 300) -> None:
+        """Periodically evict idle models on a daemon thread"""
+        def sweep():
+            while True:
+                time.sleep(interval_secs)
+                unloaded = self.evict_idle(ttl_secs)
+                if unloaded:
+                    logger.info(f"Evicted idle models: {', '.join(unloaded)}")
+        
+        threading.Thread(target=sweep, daemon=True, name="model-idle-sweeper").start()
+
+@functools.lru_cache(maxsize=1)
+def get_model_manager() -> ModelManager:
+    """Get the global model manager, creating it on first use"""
+    return ModelManager()
 
-# Global model manager instance
-model_manager = ModelManager()
+def __getattr__(name: str):
+    # Keep `from model_manager import model_manager` working without constructing at import
+    if name == "model_manager":
+        return get_model_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
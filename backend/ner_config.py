@@ -0,0 +1,13 @@
+"""
+Biomedical NER model configuration shared by the backend modules
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Read .env here too, so the value doesn't depend on which module imports this first
+load_dotenv()
+
+# Any token-classification model with the d4data label scheme can be swapped in,
+# e.g. a smaller distilled student for CPU-only deployments.
+BIOMEDICAL_NER_MODEL = os.getenv("BIOMEDICAL_NER_MODEL", "d4data/biomedical-ner-all")
@@ -6,8 +6,21 @@ This script helps set up the environment and configuration
 
 import os
 import sys
+import mmap
+import shutil
 from pathlib import Path
 
+PLACEHOLDER_API_KEY = b"your_openai_api_key_here"
+
+def file_contains(path: Path, needle: bytes) -> bool:
+    """Search a file for a byte string via mmap, without reading it into a Python string"""
+    if path.stat().st_size == 0:
+        return False  # mmap cannot map empty files
+    
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(needle) != -1
+
 def create_env_file():
     """Create .env file from template if it doesn't exist"""
     env_path = Path(".env")
@@ -22,11 +35,8 @@ def create_env_file():
         return False
     
     # Copy template to .env
-    with open(env_example_path, 'r') as template:
-        content = template.read()
-    
-    with open(env_path, 'w') as env_file:
-        env_file.write(content)
+    with open(env_example_path, 'rb') as template, open(env_path, 'wb') as env_file:
+        shutil.copyfileobj(template, env_file, 64 * 1024)
     
     print("✅ Created .env file from template")
     print("📝 Please edit .env file and add your OpenAI API key")
@@ -61,10 +71,7 @@ def validate_env_file():
         print("❌ .env file not found")
         return False
     
-    with open(env_path, 'r') as f:
-        content = f.read()
-    
-    if "your_openai_api_key_here" in content:
+    if file_contains(env_path, PLACEHOLDER_API_KEY):
         print("⚠️  OpenAI API key not set in .env file")
         print("   Please add your OpenAI API key to the .env file")
         return False
@@ -2,7 +2,7 @@
 Database setup and initialization script for SymptomAI
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -14,59 +14,84 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./symptomai.db")
 
+# Shared engine and session factory, created on first use
+_ENGINE = None
+_SESSION_FACTORY = None
+
+def create_db_engine():
+    """Create the database engine, tuning SQLite to avoid an fsync on every commit"""
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    
+    return engine
+
+def get_engine():
+    """Get the shared database engine, creating it on first use"""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_db_engine()
+    return _ENGINE
+
 def create_database():
     """Create database tables"""
-    engine = create_engine(DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     print("✅ Database tables created successfully")
 
 def get_db_session():
     """Get database session"""
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    global _SESSION_FACTORY
+    if _SESSION_FACTORY is None:
+        _SESSION_FACTORY = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _SESSION_FACTORY()
 
 def seed_sample_data():
     """Seed database with sample data for testing"""
     db = get_db_session()
     
     try:
-        # Create sample user
-        sample_user = User(
-            age=30,
-            gender="male",
-            data_retention_days=30,
-            analytics_consent=True
-        )
-        
-        db.add(sample_user)
-        db.commit()
-        db.refresh(sample_user)
-        
-        # Create sample symptom report
-        sample_report = SymptomReport(
-            user_id=sample_user.id,
-            symptom_description="I have been experiencing headaches and fatigue for the past few days",
-            ai_condition="Possible tension headache",
-            ai_severity="Medium",
-            ai_confidence=0.75,
-            urgency_score=0.4,
-            triage_level="routine",
-            analysis_data={
-                "primary_symptoms": ["headache", "fatigue"],
-                "body_systems": ["neurological"],
-                "recommendations": ["Rest", "Stay hydrated", "Monitor symptoms"]
-            }
-        )
-        
-        db.add(sample_report)
-        db.commit()
+        # One transaction for the whole seed; rolled back automatically on error
+        with db.begin():
+            # Create sample user
+            sample_user = User(
+                age=30,
+                gender="male",
+                data_retention_days=30,
+                analytics_consent=True
+            )
+            
+            db.add(sample_user)
+            db.flush()  # Assigns sample_user.id without a commit/refresh round-trip
+            
+            # Create sample symptom reports with a single parametrized INSERT
+            sample_reports = [
+                dict(
+                    user_id=sample_user.id,
+                    symptom_description="I have been experiencing headaches and fatigue for the past few days",
+                    ai_condition="Possible tension headache",
+                    ai_severity="Medium",
+                    ai_confidence=0.75,
+                    urgency_score=0.4,
+                    triage_level="routine",
+                    analysis_data={
+                        "primary_symptoms": ["headache", "fatigue"],
+                        "body_systems": ["neurological"],
+                        "recommendations": ["Rest", "Stay hydrated", "Monitor symptoms"]
+                    }
+                )
+            ]
+            db.execute(insert(SymptomReport), sample_reports)
         
         print("✅ Sample data seeded successfully")
         
     except Exception as e:
         print(f"❌ Error seeding data: {e}")
-        db.rollback()
     finally:
         db.close()
 
@@ -3,95 +3,187 @@ Smart Symptom Classification for Medical AI
 Rule-based and keyword-based symptom categorization system
 """
 
+import copy
+import functools
 import re
-from typing import Dict, List, Tuple
+import numpy as np
+from types import MappingProxyType
+from typing import Dict, List, Set, Tuple
+
+# Optional C automaton for single-pass keyword matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex notion of a word character used by \\b"""
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """Finds which keywords occur in a text, and which occur as whole words"""
+    
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self.automaton.add_word(keyword, keyword)
+            self.automaton.make_automaton()
+        else:
+            self.automaton = None
+            # UTF-8 keeps ASCII keywords byte-identical and never matches inside a multi-byte character
+            self.keyword_bytes = [(keyword, keyword.encode("utf-8")) for keyword in self.keywords]
+            self.exact_patterns = {
+                keyword: re.compile(r'\b' + re.escape(keyword) + r'\b') for keyword in self.keywords
+            }
+    
+    def find(self, text_lower: str) -> Tuple[Set[str], Set[str]]:
+        """Return (keywords found as substrings, keywords found with word boundaries)"""
+        if self.automaton is None:
+            if text_lower.isascii():
+                # Already stored one byte per character; encoding would only add a copy
+                found = {keyword for keyword in self.keywords if keyword in text_lower}
+            else:
+                # Wide (UCS-2/UCS-4) strings: search the narrower UTF-8 bytes instead
+                text_bytes = text_lower.encode("utf-8")
+                found = {keyword for keyword, keyword_b in self.keyword_bytes if keyword_b in text_bytes}
+            exact = {keyword for keyword in found if self.exact_patterns[keyword].search(text_lower)}
+            return found, exact
+        
+        found = set()
+        exact = set()
+        text_len = len(text_lower)
+        for end, keyword in self.automaton.iter(text_lower):
+            found.add(keyword)
+            if keyword in exact:
+                continue
+            start = end - len(keyword) + 1
+            if ((start == 0 or not _is_word_char(text_lower[start - 1])) and
+                    (end + 1 == text_len or not _is_word_char(text_lower[end + 1]))):
+                exact.add(keyword)
+        return found, exact
+
+# Category keyword tables, built once at import and shared read-only
+SYMPTOM_CATEGORIES = MappingProxyType({
+    "respiratory": {
+        "keywords": ("cough", "shortness of breath", "wheezing", "chest pain", "breathing", 
+                 "lungs", "asthma", "pneumonia", "bronchitis", "oxygen", "air", "respiratory"),
+        "description": "Breathing and lung-related symptoms"
+    },
+    "cardiovascular": {
+        "keywords": ("heart", "chest pain", "palpitations", "blood pressure", "cardiac",
+                 "circulation", "pulse", "arrhythmia", "angina", "heart attack"),
+        "description": "Heart and circulation-related symptoms"
+    },
+    "gastrointestinal": {
+        "keywords": ("stomach", "abdominal", "nausea", "vomiting", "diarrhea", "constipation",
+                 "gastro", "intestinal", "bowel", "digestive", "acid reflux", "indigestion"),
+        "description": "Digestive system symptoms"
+    },
+    "neurological": {
+        "keywords": ("headache", "migraine", "dizziness", "seizure", "memory", "confusion",
+                 "numbness", "tingling", "paralysis", "stroke", "brain", "neurological"),
+        "description": "Brain and nervous system symptoms"
+    },
+    "musculoskeletal": {
+        "keywords": ("muscle", "joint", "bone", "arthritis", "back pain", "neck pain",
+                 "shoulder", "knee", "hip", "fracture", "sprain", "strain", "mobility"),
+        "description": "Muscles, bones, and joints symptoms"
+    },
+    "dermatological": {
+        "keywords": ("skin", "rash", "itching", "redness", "swelling", "bruising", "lesion",
+                 "acne", "eczema", "psoriasis", "dermatitis", "wound", "cut"),
+        "description": "Skin-related symptoms"
+    },
+    "emergency": {
+        "keywords": ("severe", "sudden", "acute", "emergency", "urgent", "critical", "blood",
+                 "bleeding", "unconscious", "difficulty breathing", "chest pain", "stroke"),
+        "description": "Emergency or urgent symptoms"
+    },
+    "infectious": {
+        "keywords": ("fever", "infection", "viral", "bacterial", "flu", "cold", "temperature",
+                 "chills", "swollen glands", "lymph nodes", "immune", "contagious"),
+        "description": "Infection-related symptoms"
+    },
+    "psychological": {
+        "keywords": ("anxiety", "depression", "stress", "panic", "mood", "mental", "emotional",
+                 "sleep", "insomnia", "fatigue", "exhaustion", "psychological"),
+        "description": "Mental health and psychological symptoms"
+    },
+    "urological": {
+        "keywords": ("urinary", "bladder", "kidney", "urine", "urination", "prostate", 
+                 "incontinence", "UTI", "urological", "renal"),
+        "description": "Urinary system symptoms"
+    }
+})
+
+URGENCY_KEYWORDS = MappingProxyType({
+    "high": ("severe", "acute", "sudden", "emergency", "critical", "unbearable", "excruciating"),
+    "medium": ("persistent", "worsening", "concerning", "moderate", "ongoing"),
+    "low": ("mild", "slight", "minor", "occasional", "intermittent")
+})
+
+# Inverse of URGENCY_KEYWORDS for tallying matches
+URGENCY_LEVEL_BY_KEYWORD = MappingProxyType({
+    keyword: level for level, keywords in URGENCY_KEYWORDS.items() for keyword in keywords
+})
 
 class MedicalSymptomClassifier:
     """Rule-based medical symptom classifier"""
     
     def __init__(self):
-        self.symptom_categories = {
-            "respiratory": {
-                "keywords": ["cough", "shortness of breath", "wheezing", "chest pain", "breathing", 
-                           "lungs", "asthma", "pneumonia", "bronchitis", "oxygen", "air", "respiratory"],
-                "description": "Breathing and lung-related symptoms"
-            },
-            "cardiovascular": {
-                "keywords": ["heart", "chest pain", "palpitations", "blood pressure", "cardiac",
-                           "circulation", "pulse", "arrhythmia", "angina", "heart attack"],
-                "description": "Heart and circulation-related symptoms"
-            },
-            "gastrointestinal": {
-                "keywords": ["stomach", "abdominal", "nausea", "vomiting", "diarrhea", "constipation",
-                           "gastro", "intestinal", "bowel", "digestive", "acid reflux", "indigestion"],
-                "description": "Digestive system symptoms"
-            },
-            "neurological": {
-                "keywords": ["headache", "migraine", "dizziness", "seizure", "memory", "confusion",
-                           "numbness", "tingling", "paralysis", "stroke", "brain", "neurological"],
-                "description": "Brain and nervous system symptoms"
-            },
-            "musculoskeletal": {
-                "keywords": ["muscle", "joint", "bone", "arthritis", "back pain", "neck pain",
-                           "shoulder", "knee", "hip", "fracture", "sprain", "strain", "mobility"],
-                "description": "Muscles, bones, and joints symptoms"
-            },
-            "dermatological": {
-                "keywords": ["skin", "rash", "itching", "redness", "swelling", "bruising", "lesion",
-                           "acne", "eczema", "psoriasis", "dermatitis", "wound", "cut"],
-                "description": "Skin-related symptoms"
-            },
-            "emergency": {
-                "keywords": ["severe", "sudden", "acute", "emergency", "urgent", "critical", "blood",
-                           "bleeding", "unconscious", "difficulty breathing", "chest pain", "stroke"],
-                "description": "Emergency or urgent symptoms"
-            },
-            "infectious": {
-                "keywords": ["fever", "infection", "viral", "bacterial", "flu", "cold", "temperature",
-                           "chills", "swollen glands", "lymph nodes", "immune", "contagious"],
-                "description": "Infection-related symptoms"
-            },
-            "psychological": {
-                "keywords": ["anxiety", "depression", "stress", "panic", "mood", "mental", "emotional",
-                           "sleep", "insomnia", "fatigue", "exhaustion", "psychological"],
-                "description": "Mental health and psychological symptoms"
-            },
-            "urological": {
-                "keywords": ["urinary", "bladder", "kidney", "urine", "urination", "prostate", 
-                           "incontinence", "UTI", "urological", "renal"],
-                "description": "Urinary system symptoms"
-            }
-        }
+        self.symptom_categories = SYMPTOM_CATEGORIES
+        self.urgency_keywords = URGENCY_KEYWORDS
+        
+        # Categories are addressed by position so scores fit in a flat vector
+        self.cat_names = list(self.symptom_categories)
+        self.cat_index = {category: cat_id for cat_id, category in enumerate(self.cat_names)}
+        
+        # Inverted index: lowercased keyword -> (category id, keyword rank, keyword)
+        self.keyword_to_categories = {}
+        self.category_max_score = {}
+        for cat_id, (category, data) in enumerate(self.symptom_categories.items()):
+            self.category_max_score[category] = len(data["keywords"])
+            for keyword_rank, keyword in enumerate(data["keywords"]):
+                self.keyword_to_categories.setdefault(keyword.lower(), []).append(
+                    (cat_id, keyword_rank, keyword)
+                )
+        
+        # Build the matchers once; every call then scans the text a single time
+        self.category_matcher = KeywordMatcher(list(self.keyword_to_categories))
+        self.urgency_matcher = KeywordMatcher(
+            [keyword for keywords in self.urgency_keywords.values() for keyword in keywords]
+        )
     
     def classify_symptoms(self, symptoms_text: str) -> Dict:
         """Classify symptoms using rule-based approach"""
         symptoms_lower = symptoms_text.lower()
+        found, exact = self.category_matcher.find(symptoms_lower)
         
-        # Count keyword matches for each category
-        category_scores = {}
-        
-        for category, data in self.symptom_categories.items():
-            score = 0
-            matched_keywords = []
-            
-            for keyword in data["keywords"]:
-                if keyword.lower() in symptoms_lower:
-                    score += 1
-                    matched_keywords.append(keyword)
-                    
-                    # Give extra weight to exact matches
-                    if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', symptoms_lower):
-                        score += 0.5
-            
-            if score > 0:
-                category_scores[category] = {
-                    "score": score,
-                    "matched_keywords": matched_keywords,
-                    "description": data["description"]
-                }
-        
-        # Sort by score
-        sorted_categories = sorted(category_scores.items(), key=lambda x: x[1]["score"], reverse=True)
+        # Credit every category owning a matched keyword; work scales with hits only
+        scores = np.zeros(len(self.cat_names))
+        matched = {}
+        for keyword_lower in found:
+            # Give extra weight to exact matches
+            points = 1.5 if keyword_lower in exact else 1.0
+            for cat_id, keyword_rank, keyword in self.keyword_to_categories[keyword_lower]:
+                scores[cat_id] += points
+                matched.setdefault(cat_id, []).append((keyword_rank, keyword))
+        
+        # Sort by score; a stable sort keeps table order for ties, as before
+        sorted_categories = []
+        for cat_id in np.argsort(-scores, kind="stable"):
+            if scores[cat_id] == 0:
+                break  # Remaining categories had no matches
+            category = self.cat_names[cat_id]
+            sorted_categories.append((category, {
+                "score": float(scores[cat_id]),
+                "matched_keywords": [keyword for _, keyword in sorted(matched[cat_id])],
+                "description": self.symptom_categories[category]["description"]
+            }))
         
         if not sorted_categories:
             return {
@@ -107,7 +199,7 @@ class MedicalSymptomClassifier:
         primary_score = primary[1]["score"]
         
         # Calculate confidence based on score and keyword matches
-        max_possible_score = len(self.symptom_categories[primary_category]["keywords"])
+        max_possible_score = self.category_max_score[primary_category]
         confidence = min(0.95, (primary_score / max_possible_score) * 0.8 + 0.3)
         
         return {
@@ -120,19 +212,11 @@ class MedicalSymptomClassifier:
     
     def get_urgency_indicators(self, symptoms_text: str) -> Dict:
         """Detect urgency indicators in symptoms"""
-        urgency_keywords = {
-            "high": ["severe", "acute", "sudden", "emergency", "critical", "unbearable", "excruciating"],
-            "medium": ["persistent", "worsening", "concerning", "moderate", "ongoing"],
-            "low": ["mild", "slight", "minor", "occasional", "intermittent"]
-        }
-        
-        symptoms_lower = symptoms_text.lower()
+        found, _ = self.urgency_matcher.find(symptoms_text.lower())
         urgency_scores = {"high": 0, "medium": 0, "low": 0}
         
-        for level, keywords in urgency_keywords.items():
-            for keyword in keywords:
-                if keyword in symptoms_lower:
-                    urgency_scores[level] += 1
+        for keyword in found:
+            urgency_scores[URGENCY_LEVEL_BY_KEYWORD[keyword]] += 1
         
         # Determine overall urgency
         if urgency_scores["high"] > 0:
@@ -156,8 +240,15 @@ medical_classifier = MedicalSymptomClassifier()
 
 def classify_medical_symptoms(symptoms_text: str) -> Dict:
     """Main function to classify medical symptoms"""
-    classification = medical_classifier.classify_symptoms(symptoms_text)
-    urgency = medical_classifier.get_urgency_indicators(symptoms_text)
+    # Matching is case-insensitive and edge whitespace never affects it, so normalize for the cache.
+    # The cached dict is shared, so each caller gets its own copy.
+    return copy.deepcopy(_classify_cached(symptoms_text.strip().lower()))
+
+@functools.lru_cache(maxsize=1024)
+def _classify_cached(text_norm: str) -> Dict:
+    """Classify normalized symptom text (cached)"""
+    classification = medical_classifier.classify_symptoms(text_norm)
+    urgency = medical_classifier.get_urgency_indicators(text_norm)
     
     return {
         **classification,
@@ -5,17 +5,27 @@ Test the Medical Symptom Checker API endpoints
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from _probe import dumps
 import asyncio
 import sys
 
 BASE_URL = "http://localhost:8000"
 
+# One pooled session so every request reuses keep-alive connections to BASE_URL
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Bodies are pre-serialized by _probe.dumps (orjson when installed) and sent as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 def test_health_endpoint():
     """Test the health check endpoint"""
     print("🔍 Testing health endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = SESSION.get(f"{BASE_URL}/health", timeout=10)
         if response.status_code == 200:
             print("✅ Health endpoint working")
             print(f"   Response: {response.json()}")
@@ -39,10 +49,10 @@ def test_analyze_symptoms():
     
     try:
         print(f"   Sending request with symptoms: {test_data['symptoms'][:50]}...")
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/analyze-symptoms",
-            json=test_data,
-            headers={"Content-Type": "application/json"},
+            data=dumps(test_data),
+            headers=JSON_HEADERS,
             timeout=30
         )
         
@@ -70,15 +80,16 @@ def test_invalid_input():
     """Test with invalid input"""
     print("\n🔍 Testing invalid input handling...")
     
-    invalid_data = {
+    invalid_body = dumps({
         "symptoms": "short"  # Too short
-    }
+    })
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/analyze-symptoms",
-            json=invalid_data,
-            headers={"Content-Type": "application/json"}
+            data=invalid_body,
+            headers=JSON_HEADERS,
+            timeout=10
         )
         
         if response.status_code == 422:  # Validation error expected
@@ -97,36 +108,39 @@ def main():
     print("🧪 Starting API Tests for Medical Symptom Checker")
     print("=" * 50)
     
-    # Check if server is running
     try:
-        response = requests.get(BASE_URL, timeout=5)
-        print(f"✅ Server is running at {BASE_URL}")
-    except:
-        print(f"❌ Server is not running at {BASE_URL}")
-        print("   Please start the server first with: python start_server.py")
-        sys.exit(1)
-    
-    # Run tests
-    tests = [
-        test_health_endpoint,
-        test_analyze_symptoms,
-        test_invalid_input
-    ]
-    
-    passed = 0
-    total = len(tests)
-    
-    for test in tests:
-        if test():
-            passed += 1
-    
-    print("\n" + "=" * 50)
-    print(f"🏁 Test Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("🎉 All tests passed! API is working correctly.")
-    else:
-        print("⚠️  Some tests failed. Please check the server logs.")
+        # Check if server is running
+        try:
+            response = SESSION.get(BASE_URL, timeout=5)
+            print(f"✅ Server is running at {BASE_URL}")
+        except:
+            print(f"❌ Server is not running at {BASE_URL}")
+            print("   Please start the server first with: python start_server.py")
+            sys.exit(1)
+        
+        # Run tests
+        tests = [
+            test_health_endpoint,
+            test_analyze_symptoms,
+            test_invalid_input
+        ]
+        
+        passed = 0
+        total = len(tests)
+        
+        for test in tests:
+            if test():
+                passed += 1
+        
+        print("\n" + "=" * 50)
+        print(f"🏁 Test Results: {passed}/{total} tests passed")
+        
+        if passed == total:
+            print("🎉 All tests passed! API is working correctly.")
+        else:
+            print("⚠️  Some tests failed. Please check the server logs.")
+    finally:
+        SESSION.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
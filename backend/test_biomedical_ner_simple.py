@@ -5,9 +5,11 @@ Simple test script to verify the biomedical NER model works correctly
 
 import sys
 import os
+import asyncio
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from main_simplified import load_biomedical_model, biomedical_ner, BIOMEDICAL_NER_AVAILABLE, extract_medical_entities
+from main_simplified import load_biomedical_model, BIOMEDICAL_NER_AVAILABLE, extract_medical_entities
+from test_biomedical_ner import _get_pipe
 
 def test_biomedical_ner():
     print("🧪 Testing Biomedical NER Model Loading and Function...")
@@ -23,12 +25,13 @@ def test_biomedical_ner():
         print("\n2. Testing direct model usage...")
         test_text = "I have a severe headache and fever for 3 days"
         try:
-            results = biomedical_ner(test_text)
+            results = _get_pipe()(test_text)
             print(f"✅ Direct model call successful, found {len(results)} entities")
             
-            # Show first few entities
+            # Show first few entities (grouped spans carry 'entity_group', raw tokens 'entity')
             for i, entity in enumerate(results[:5]):
-                print(f"   Entity {i+1}: {entity['word']} -> {entity['entity']} (confidence: {entity['score']:.4f})")
+                label = entity.get('entity_group', entity.get('entity'))
+                print(f"   Entity {i+1}: {entity['word']} -> {label} (confidence: {entity['score']:.4f})")
         except Exception as e:
             print(f"❌ Direct model call failed: {e}")
             return False
@@ -36,7 +39,7 @@ def test_biomedical_ner():
         # Test 3: Test extraction function
         print("\n3. Testing entity extraction function...")
         try:
-            entities = extract_medical_entities(test_text)
+            entities = asyncio.run(extract_medical_entities(test_text))
             print(f"✅ Entity extraction successful: {entities}")
         except Exception as e:
             print(f"❌ Entity extraction failed: {e}")
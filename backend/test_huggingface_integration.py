@@ -4,17 +4,28 @@ Test script to verify Hugging Face integration in the Medical Symptom Checker AP
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from _probe import dumps
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # API endpoint
 BASE_URL = "http://localhost:8000"
 
+# One pooled session so every request reuses keep-alive connections to BASE_URL
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Bodies are pre-serialized by _probe.dumps (orjson when installed) and sent as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 def test_health_endpoint():
     """Test the health endpoint to verify both models are available"""
     print("🔍 Testing health endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = SESSION.get(f"{BASE_URL}/health", timeout=10)
         if response.status_code == 200:
             data = response.json()
             print("✅ Health check successful!")
@@ -59,14 +70,23 @@ def test_symptom_analysis():
         }
     ]
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n   Test {i}: {test_case['name']}")
-        try:
-            response = requests.post(
+    # Send all cases at once over the pooled session; print results in order as they resolve
+    with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+        futures = [
+            executor.submit(
+                SESSION.post,
                 f"{BASE_URL}/analyze-symptoms",
-                json=test_case['data'],
-                headers={"Content-Type": "application/json"}
+                data=dumps(test_case['data']),
+                headers=JSON_HEADERS,
+                timeout=30
             )
+            for test_case in test_cases
+        ]
+    
+    for i, (test_case, future) in enumerate(zip(test_cases, futures), 1):
+        print(f"\n   Test {i}: {test_case['name']}")
+        try:
+            response = future.result()
             
             if response.status_code == 200:
                 data = response.json()
@@ -92,21 +112,24 @@ def main():
     print("🚀 Medical Symptom Checker - Hugging Face Integration Test")
     print("=" * 60)
     
-    # Test health endpoint first
-    if not test_health_endpoint():
-        print("\n❌ Server is not running or not healthy. Please start the server first.")
-        return
-    
-    # Test symptom analysis
-    test_symptom_analysis()
-    
-    print("\n" + "=" * 60)
-    print("✅ Integration test completed!")
-    print("📝 Summary:")
-    print("   - Hugging Face model: Loaded and working locally")
-    print("   - OpenAI fallback: Available when needed")
-    print("   - No API costs: Analysis runs on local model first")
-    print("   - Robust fallback: OpenAI available if local model fails")
+    try:
+        # Test health endpoint first
+        if not test_health_endpoint():
+            print("\n❌ Server is not running or not healthy. Please start the server first.")
+            return
+        
+        # Test symptom analysis
+        test_symptom_analysis()
+        
+        print("\n" + "=" * 60)
+        print("✅ Integration test completed!")
+        print("📝 Summary:")
+        print("   - Hugging Face model: Loaded and working locally")
+        print("   - OpenAI fallback: Available when needed")
+        print("   - No API costs: Analysis runs on local model first")
+        print("   - Robust fallback: OpenAI available if local model fails")
+    finally:
+        SESSION.close()
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Test transformers import and pipeline functionality"""
 
+from concurrent.futures import ThreadPoolExecutor
+
 print("Testing transformers import...")
 
 try:
@@ -39,6 +41,26 @@ models_to_test = [
     ("zero-shot-classification", "facebook/bart-large-mnli"),
 ]
 
+try:
+    from huggingface_hub import snapshot_download
+    HF_HUB_AVAILABLE = True
+except ImportError as e:
+    HF_HUB_AVAILABLE = False
+    print(f"⚠️  huggingface_hub not available, models will download during loading: {e}")
+
+# Download all model snapshots concurrently (network-bound); pipelines below are built serially
+def _download(model_name):
+    try:
+        # Skip TF/Flax/Rust weight duplicates that the PyTorch pipeline never reads
+        snapshot_download(model_name, ignore_patterns=["*.h5", "*.msgpack", "*.ot", "rust_model*"])
+    except Exception as e:
+        print(f"⚠️  Prefetch of {model_name} failed: {e}")
+
+if HF_HUB_AVAILABLE:
+    print("\nDownloading model snapshots...")
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(_download, [model_name for _, model_name in models_to_test]))
+
 for task, model_name in models_to_test:
     try:
         print(f"\nTesting {model_name}...")
@@ -2,29 +2,63 @@
 User Profile and Medical History Management System
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Index
+from sqlalchemy import case, cast, func, select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, joinedload
 from sqlalchemy.dialects.postgresql import JSON
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import hashlib
+from typing import Iterator, List, Dict, Optional
+import bisect
+import re
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import json
 
+# Optional fast JSON encoder for streamed data exports
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 Base = declarative_base()
 
+# Candidate symptom terms: runs of 4+ letters that are not common English filler words
+_WORD_RE = re.compile(r"[a-z]{4,}")
+_STOP = frozenset({
+    "have", "been", "with", "that", "this", "from", "they", "them", "their", "there",
+    "were", "when", "what", "which", "will", "would", "could", "should", "about",
+    "after", "before", "also", "some", "very", "really", "just", "into", "over",
+    "since", "than", "then", "only", "feel", "feeling", "felt", "like", "having",
+    "days", "weeks", "week", "past", "last", "today", "yesterday", "morning", "night",
+    "experiencing", "started", "getting", "keep", "much", "more", "still", "every",
+})
+
+def _dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+# Naive UTC "now" (the DateTime columns are timezone-naive), bound once for column defaults and queries
+_utcnow = datetime.utcnow
+
+# Age range buckets for anonymization: _AGE_LABELS[i] covers ages below _AGE_BOUNDS[i]
+_AGE_BOUNDS = (18, 30, 50, 70)
+_AGE_LABELS = ("under_18", "18_30", "30_50", "50_70", "over_70")
+
 class User(Base):
     """User profile model"""
     __tablename__ = "users"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_uuid = Column(String, unique=True, index=True, default=lambda: str(uuid.uuid4()))
+    user_uuid = Column(String(32), unique=True, index=True, default=lambda: uuid.uuid4().hex)
     age = Column(Integer)
     gender = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_active = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
+    last_active = Column(DateTime, default=_utcnow)
     
     # Privacy settings
     data_retention_days = Column(Integer, default=30)
@@ -39,11 +73,11 @@ class SymptomReport(Base):
     __tablename__ = "symptom_reports"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     
     # Input data
     symptom_description = Column(Text)
-    reported_at = Column(DateTime, default=datetime.utcnow)
+    reported_at = Column(DateTime, default=_utcnow)
     
     # Analysis results
     ai_condition = Column(String)
@@ -59,6 +93,11 @@ class SymptomReport(Base):
     
     # Relationships
     user = relationship("User", back_populates="symptom_reports")
+    
+    __table_args__ = (
+        # Per-user date range filters, newest first (history lookups, retention cleanup)
+        Index("ix_symptom_reports_user_date", user_id, reported_at.desc()),
+    )
 
 class MedicalHistory(Base):
     """User's medical history and conditions"""
@@ -77,13 +116,20 @@ class MedicalHistory(Base):
     user = relationship("User", back_populates="medical_history")
 
 # Pydantic models for API
+# Immutable request/response payloads; unknown fields from clients are dropped
+_API_MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True)
+
 class UserProfile(BaseModel):
+    model_config = _API_MODEL_CONFIG
+    
     age: Optional[int] = None
     gender: Optional[str] = None
     data_retention_days: int = 30
     analytics_consent: bool = False
 
 class MedicalHistoryItem(BaseModel):
+    model_config = _API_MODEL_CONFIG
+    
     condition_name: str
     diagnosed_date: Optional[str] = None
     is_chronic: bool = False
@@ -91,11 +137,15 @@ class MedicalHistoryItem(BaseModel):
     notes: Optional[str] = None
 
 class SymptomReportCreate(BaseModel):
+    model_config = _API_MODEL_CONFIG
+    
     symptom_description: str
     age: Optional[int] = None
     gender: Optional[str] = None
 
 class SymptomReportResponse(BaseModel):
+    model_config = _API_MODEL_CONFIG
+    
     id: int
     reported_at: datetime
     symptom_description: str
@@ -111,8 +161,12 @@ class UserManager:
     def __init__(self, db_session):
         self.db = db_session
     
-    def create_or_get_user(self, user_data: UserProfile) -> User:
-        """Create a new user or return existing anonymous user"""
+    def create_or_get_user(self, user_data: UserProfile, commit: bool = True) -> User:
+        """Create a new user or return existing anonymous user
+        
+        Pass commit=False when running inside a caller-managed transaction; the user
+        is flushed (so it has an id) and committed along with the outer transaction.
+        """
         # For privacy, we use anonymous users with UUID
         user = User(
             age=user_data.age,
@@ -122,35 +176,47 @@ class UserManager:
         )
         
         self.db.add(user)
+        if not commit:
+            self.db.flush()
+            return user
+        
         self.db.commit()
         self.db.refresh(user)
         
         return user
     
+    def create_users_bulk(self, user_datas: List[UserProfile], chunk_size: int = 500) -> List[User]:
+        """Create many anonymous users, inserting and committing in chunks"""
+        users = [User(**user_data.model_dump()) for user_data in user_datas]
+        
+        for start in range(0, len(users), chunk_size):
+            self.db.add_all(users[start:start + chunk_size])
+            self.db.commit()
+        
+        return users
+    
     def get_user_by_uuid(self, user_uuid: str) -> Optional[User]:
         """Get user by UUID"""
         return self.db.query(User).filter(User.user_uuid == user_uuid).first()
     
     def clean_expired_data(self):
         """Remove expired user data based on retention settings"""
-        expired_users = self.db.query(User).filter(
-            User.last_active < datetime.utcnow() - timedelta(days=365)
-        ).all()
+        now = _utcnow()
+        expired_users = self.db.query(User.id, User.data_retention_days).filter(
+            User.last_active < now - timedelta(days=365)
+        ).yield_per(500)
         
-        for user in expired_users:
+        for user_id, data_retention_days in expired_users:
             # Remove user data if retention period exceeded
-            retention_cutoff = datetime.utcnow() - timedelta(days=user.data_retention_days)
+            retention_cutoff = now - timedelta(days=data_retention_days)
             
-            # Delete old symptom reports
-            old_reports = self.db.query(SymptomReport).filter(
-                SymptomReport.user_id == user.id,
+            # Delete old symptom reports in a single statement
+            self.db.query(SymptomReport).filter(
+                SymptomReport.user_id == user_id,
                 SymptomReport.reported_at < retention_cutoff
-            ).all()
-            
-            for report in old_reports:
-                self.db.delete(report)
-            
-            self.db.commit()
+            ).delete(synchronize_session=False)
+        
+        self.db.commit()
 
 class SymptomHistoryAnalyzer:
     """Analyze user's symptom history for patterns"""
@@ -160,7 +226,7 @@ class SymptomHistoryAnalyzer:
     
     def get_user_symptom_history(self, user_id: int, days: int = 30) -> List[SymptomReport]:
         """Get user's recent symptom reports"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        cutoff_date = _utcnow() - timedelta(days=days)
         
         return self.db.query(SymptomReport).filter(
             SymptomReport.user_id == user_id,
@@ -169,15 +235,21 @@ class SymptomHistoryAnalyzer:
     
     def analyze_symptom_patterns(self, user_id: int) -> Dict:
         """Analyze patterns in user's symptom reports"""
-        reports = self.get_user_symptom_history(user_id, days=90)
+        since = _utcnow() - timedelta(days=90)
+        
+        # Only the descriptions are needed in Python; trends are aggregated in SQL
+        reports = self.db.query(SymptomReport.symptom_description).filter(
+            SymptomReport.user_id == user_id,
+            SymptomReport.reported_at >= since
+        ).all()
         
         if not reports:
             return {"pattern_analysis": "No recent symptom history"}
         
         # Analyze patterns
-        severity_trend = self._analyze_severity_trend(reports)
+        severity_trend = self._analyze_severity_trend(user_id, since)
         common_symptoms = self._find_common_symptoms(reports)
-        frequency_analysis = self._analyze_frequency(reports)
+        frequency_analysis = self._analyze_frequency(user_id, since)
         
         return {
             "total_reports": len(reports),
@@ -189,21 +261,31 @@ class SymptomHistoryAnalyzer:
             )
         }
     
-    def _analyze_severity_trend(self, reports: List[SymptomReport]) -> Dict:
+    def _analyze_severity_trend(self, user_id: int, since: datetime) -> Dict:
         """Analyze if symptoms are getting better or worse"""
-        if len(reports) < 2:
-            return {"trend": "insufficient_data"}
+        # Rank reports newest first, then average the last 5 against everything earlier
+        ranked = select(
+            SymptomReport.urgency_score,
+            func.row_number().over(
+                order_by=(SymptomReport.reported_at.desc(), SymptomReport.id.desc())
+            ).label("rn")
+        ).where(
+            SymptomReport.user_id == user_id,
+            SymptomReport.reported_at >= since
+        ).subquery()
         
-        # Sort by date and analyze severity scores
-        sorted_reports = sorted(reports, key=lambda x: x.reported_at)
-        recent_scores = [r.urgency_score for r in sorted_reports[-5:]]  # Last 5 reports
-        older_scores = [r.urgency_score for r in sorted_reports[:-5]]   # Earlier reports
+        total, recent_avg, older_avg = self.db.execute(select(
+            func.count(),
+            func.avg(case((ranked.c.rn <= 5, ranked.c.urgency_score))),  # Last 5 reports
+            func.avg(case((ranked.c.rn > 5, ranked.c.urgency_score)))    # Earlier reports
+        )).one()
         
-        if not older_scores:
+        # Need at least one report older than the last 5 to compare against
+        if total <= 5:
             return {"trend": "insufficient_data"}
         
-        recent_avg = sum(recent_scores) / len(recent_scores)
-        older_avg = sum(older_scores) / len(older_scores)
+        recent_avg = float(recent_avg)
+        older_avg = float(older_avg)
         
         if recent_avg > older_avg + 0.1:
             return {"trend": "worsening", "change": recent_avg - older_avg}
@@ -214,34 +296,39 @@ class SymptomHistoryAnalyzer:
     
     def _find_common_symptoms(self, reports: List[SymptomReport]) -> List[Dict]:
         """Find commonly reported symptoms"""
-        symptom_counts = {}
-        
-        for report in reports:
-            # Extract keywords from symptom descriptions
-            words = report.symptom_description.lower().split()
-            medical_terms = [word for word in words if len(word) > 3]  # Simple filtering
-            
-            for term in medical_terms:
-                symptom_counts[term] = symptom_counts.get(term, 0) + 1
+        # Extract keywords from symptom descriptions, skipping filler words
+        symptom_counts = Counter(
+            word
+            for report in reports
+            for word in _WORD_RE.findall(report.symptom_description.lower())
+            if word not in _STOP
+        )
         
         # Return top 5 most common terms
-        sorted_symptoms = sorted(symptom_counts.items(), key=lambda x: x[1], reverse=True)
-        return [{"symptom": term, "frequency": count} for term, count in sorted_symptoms[:5]]
+        return [{"symptom": term, "frequency": count} for term, count in symptom_counts.most_common(5)]
     
-    def _analyze_frequency(self, reports: List[SymptomReport]) -> Dict:
+    def _analyze_frequency(self, user_id: int, since: datetime) -> Dict:
         """Analyze reporting frequency"""
-        if len(reports) < 2:
-            return {"frequency": "single_report"}
+        # Whole days between each report and the one before it
+        previous = func.lag(SymptomReport.reported_at).over(
+            order_by=(SymptomReport.reported_at, SymptomReport.id)
+        )
+        gaps = select(
+            self._whole_days_between(SymptomReport.reported_at, previous).label("days")
+        ).where(
+            SymptomReport.user_id == user_id,
+            SymptomReport.reported_at >= since
+        ).subquery()
         
-        # Calculate average days between reports
-        sorted_reports = sorted(reports, key=lambda x: x.reported_at)
-        intervals = []
+        total, avg_interval = self.db.execute(
+            select(func.count(), func.avg(gaps.c.days))
+        ).one()
         
-        for i in range(1, len(sorted_reports)):
-            diff = sorted_reports[i].reported_at - sorted_reports[i-1].reported_at
-            intervals.append(diff.days)
+        if total < 2:
+            return {"frequency": "single_report"}
         
-        avg_interval = sum(intervals) / len(intervals)
+        # Calculate average days between reports
+        avg_interval = float(avg_interval)
         
         if avg_interval <= 7:
             return {"frequency": "very_frequent", "avg_days_between": avg_interval}
@@ -250,6 +337,13 @@ class SymptomHistoryAnalyzer:
         else:
             return {"frequency": "occasional", "avg_days_between": avg_interval}
     
+    def _whole_days_between(self, later, earlier):
+        """SQL expression for the whole days from earlier to later (non-negative intervals)"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            seconds = cast(func.strftime("%s", later), Integer) - cast(func.strftime("%s", earlier), Integer)
+            return seconds // 86400
+        return func.floor(func.extract("epoch", later - earlier) / 86400)
+    
     def _generate_pattern_recommendations(self, severity_trend: Dict, common_symptoms: List, frequency: Dict) -> List[str]:
         """Generate recommendations based on patterns"""
         recommendations = []
@@ -275,17 +369,7 @@ class PrivacyManager:
         # Create hash of sensitive data instead of storing directly
         if 'age' in user_data:
             # Group ages into ranges for privacy
-            age = user_data['age']
-            if age < 18:
-                user_data['age_range'] = 'under_18'
-            elif age < 30:
-                user_data['age_range'] = '18_30'
-            elif age < 50:
-                user_data['age_range'] = '30_50'
-            elif age < 70:
-                user_data['age_range'] = '50_70'
-            else:
-                user_data['age_range'] = 'over_70'
+            user_data['age_range'] = _AGE_LABELS[bisect.bisect_right(_AGE_BOUNDS, user_data['age'])]
             
             del user_data['age']  # Remove exact age
         
@@ -294,30 +378,56 @@ class PrivacyManager:
     @staticmethod
     def generate_data_export(user_id: int, db_session) -> Dict:
         """Generate user data export for GDPR compliance"""
-        user = db_session.query(User).filter(User.id == user_id).first()
+        # Fetch the user and all of their reports in one round-trip
+        user = db_session.query(User).options(
+            joinedload(User.symptom_reports)
+        ).filter(User.id == user_id).first()
         if not user:
             return {}
         
-        symptom_reports = db_session.query(SymptomReport).filter(
-            SymptomReport.user_id == user_id
-        ).all()
-        
         return {
-            "user_profile": {
-                "user_uuid": user.user_uuid,
-                "age": user.age,
-                "gender": user.gender,
-                "created_at": user.created_at.isoformat(),
-                "data_retention_days": user.data_retention_days
-            },
+            "user_profile": PrivacyManager._export_profile(user),
             "symptom_reports": [
-                {
-                    "reported_at": report.reported_at.isoformat(),
-                    "symptom_description": report.symptom_description,
-                    "ai_condition": report.ai_condition,
-                    "ai_severity": report.ai_severity,
-                    "ai_confidence": report.ai_confidence
-                }
-                for report in symptom_reports
+                PrivacyManager._export_report(report) for report in user.symptom_reports
             ]
         }
+    
+    @staticmethod
+    def stream_data_export(user: User, db_session) -> Iterator[bytes]:
+        """Generate an already-loaded user's data export as streamed JSON bytes
+        
+        Reports are fetched in batches with yield_per, so the session must stay open until
+        the iterator is exhausted (e.g. a FastAPI StreamingResponse with a yield dependency).
+        """
+        user_id = user.id
+        
+        def chunks() -> Iterator[bytes]:
+            yield b'{"user_profile":' + _dumps(PrivacyManager._export_profile(user)) + b',"symptom_reports":['
+            reports = db_session.query(SymptomReport).filter(
+                SymptomReport.user_id == user_id
+            ).yield_per(500)
+            for i, report in enumerate(reports):
+                yield (b"," if i else b"") + _dumps(PrivacyManager._export_report(report))
+            yield b"]}"
+        
+        return chunks()
+    
+    @staticmethod
+    def _export_profile(user: User) -> Dict:
+        return {
+            "user_uuid": user.user_uuid,
+            "age": user.age,
+            "gender": user.gender,
+            "created_at": user.created_at.isoformat(),
+            "data_retention_days": user.data_retention_days
+        }
+    
+    @staticmethod
+    def _export_report(report: SymptomReport) -> Dict:
+        return {
+            "reported_at": report.reported_at.isoformat(),
+            "symptom_description": report.symptom_description,
+            "ai_condition": report.ai_condition,
+            "ai_severity": report.ai_severity,
+            "ai_confidence": report.ai_confidence
+        }
@@ -1,22 +1,307 @@
 """
 Zero-Shot Classification Enhancement for Medical AI
-Adds BART-based zero-shot classification capabilities
+Adds NLI-based zero-shot classification capabilities
 """
 
-from transformers import pipeline
+import functools
+import os
+import sys
+import threading
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+# Optional ONNX Runtime backend with static INT8 quantization (CPU)
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoCalibrationConfig, AutoQuantizationConfig
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    OPTIMUM_AVAILABLE = False
+
+# The zero-shot pipeline needs an NLI (entailment) head. The default 6-layer MiniLM cross-encoder
+# is ~10x cheaper than BART-MNLI; set ZERO_SHOT_MODEL=valhalla/distilbart-mnli-12-3 for more accuracy.
+ZERO_SHOT_MODEL = os.getenv("ZERO_SHOT_MODEL", "cross-encoder/nli-MiniLM2-L6-H768")
+# One-time ONNX export (and calibrated INT8 variant) of ZERO_SHOT_MODEL, reused across runs
+ONNX_ZERO_SHOT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "onnx_zero_shot", ZERO_SHOT_MODEL.replace("/", "__")
+)
+HYPOTHESIS_TEMPLATE = "This example is {}."
+# 'nli' (cross-encoder, default) or 'embedding' (bi-encoder cosine similarity to label anchors)
+ZERO_SHOT_BACKEND = os.getenv("ZERO_SHOT_BACKEND", "nli")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Cosine similarities are scaled before the softmax so scores spread like NLI probabilities
+SIMILARITY_SCALE = 20.0
+MAX_LENGTH = 128
+# The main backend (main_advanced_models.py) keeps a classifier loaded and serves it here
+CLASSIFY_URL = "http://localhost:8000/classify"
+
+# Representative premises for static quantization calibration (paired with every category)
+CALIBRATION_SYMPTOMS = [
+    "I have been experiencing chest pain and shortness of breath",
+    "Severe headache with nausea and vision problems",
+    "Persistent cough with fever and fatigue",
+    "Stomach pain with vomiting and diarrhea",
+    "Itchy red rash spreading across my arms",
+    "Lower back pain that gets worse when I bend over",
+    "Feeling anxious and unable to sleep for weeks",
+    "Burning sensation when urinating and frequent urination",
+]
+
+class NLIZeroShotClassifier:
+    """Zero-shot classifier that scores every candidate label in one batched NLI forward pass
+    
+    Called like the transformers zero-shot pipeline (single-label mode) and returns the same
+    {"sequence", "labels", "scores"} dict, or a list of them when given a list of texts. Hypothesis
+    token ids are cached per label set, so a call only tokenizes each premise once and stacks it
+    against each cached hypothesis.
+    """
+    
+    def __init__(self, model, tokenizer, pad_to_max_length=False):
+        self.model = model
+        self.tokenizer = tokenizer
+        # Static (num_labels, MAX_LENGTH) inputs keep a compiled graph from re-specializing per length
+        self.pad_to_max_length = pad_to_max_length
+        # Original module while self.model is an (unverified) torch.compile wrapper, else None
+        self.eager_model = None
+        self.entailment_id = next(
+            (idx for label, idx in model.config.label2id.items() if label.lower().startswith("entail")), -1
+        )
+        self.use_token_type_ids = "token_type_ids" in tokenizer.model_input_names
+        self.device = getattr(model, "device", torch.device("cpu"))
+        self._hypothesis_ids = functools.lru_cache(maxsize=32)(self._tokenize_hypotheses)
+        # Input tensors are preallocated per label count and refilled in place; the lock keeps
+        # concurrent calls from overwriting a buffer while a forward pass is still reading it
+        self._input_buffers = {}
+        self._lock = threading.Lock()
+    
+    def _tokenize_hypotheses(self, labels: tuple) -> list:
+        hypotheses = [HYPOTHESIS_TEMPLATE.format(label) for label in labels]
+        return self.tokenizer(hypotheses, add_special_tokens=False)["input_ids"]
+    
+    def _buffers(self, num_rows: int) -> dict:
+        buffers = self._input_buffers.get(num_rows)
+        if buffers is None:
+            names = ["input_ids", "attention_mask"] + (["token_type_ids"] if self.use_token_type_ids else [])
+            buffers = {name: torch.zeros((num_rows, MAX_LENGTH), dtype=torch.long) for name in names}
+            if self.device.type == "cuda":
+                # Page-locked host buffers allow asynchronous copies to the GPU. __call__ keeps the lock
+                # until its results are on the host, so no copy from these buffers is still in flight.
+                buffers = {name: buffer.pin_memory() for name, buffer in buffers.items()}
+            self._input_buffers[num_rows] = buffers
+        return buffers
+    
+    def _encode_pairs(self, premises_ids: list, hypothesis_ids: list) -> dict:
+        """Fill padded (num_premises * num_labels, seq_len) model inputs in place, premise-major"""
+        tokenizer = self.tokenizer
+        num_special = tokenizer.num_special_tokens_to_add(pair=True)
+        rows, type_rows = [], []
+        for premise_ids in premises_ids:
+            for hyp_ids in hypothesis_ids:
+                premise = premise_ids[:max(0, MAX_LENGTH - num_special - len(hyp_ids))]
+                rows.append(tokenizer.build_inputs_with_special_tokens(premise, hyp_ids))
+                if self.use_token_type_ids:
+                    type_rows.append(tokenizer.create_token_type_ids_from_sequences(premise, hyp_ids))
+        
+        seq_len = MAX_LENGTH if self.pad_to_max_length else max(len(row) for row in rows)
+        buffers = self._buffers(len(rows))
+        input_ids, attention_mask = buffers["input_ids"], buffers["attention_mask"]
+        for k, row in enumerate(rows):
+            n = len(row)
+            input_ids[k, :n] = torch.tensor(row)
+            input_ids[k, n:seq_len] = tokenizer.pad_token_id
+            attention_mask[k, :n] = 1
+            attention_mask[k, n:seq_len] = 0
+        
+        if self.use_token_type_ids:
+            token_type_ids = buffers["token_type_ids"]
+            for k, row in enumerate(type_rows):
+                token_type_ids[k, :len(row)] = torch.tensor(row)
+                token_type_ids[k, len(row):seq_len] = 0
+        return {name: buffer[:, :seq_len] for name, buffer in buffers.items()}
+    
+    def __call__(self, sequences, candidate_labels, batch_size: int = 8):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        labels = tuple(candidate_labels)
+        hypothesis_ids = self._hypothesis_ids(labels)
+        
+        results = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            premises_ids = self.tokenizer(batch, add_special_tokens=False)["input_ids"]
+            with self._lock, torch.inference_mode():
+                inputs = self._encode_pairs(premises_ids, hypothesis_ids)
+                if self.device.type == "cuda":
+                    inputs = {name: tensor.to(self.device, non_blocking=True) for name, tensor in inputs.items()}
+                logits = self.model(**inputs).logits
+                # Single-label mode: softmax of the entailment logits across each text's candidate labels.
+                # .tolist() waits for the results, so the buffers are free again before the lock is released.
+                entailment = logits[:, self.entailment_id].float().view(len(batch), len(labels))
+                batch_scores = entailment.softmax(dim=1).tolist()
+            
+            for sequence, scores in zip(batch, batch_scores):
+                ranked = sorted(zip(labels, scores), key=lambda pair: pair[1], reverse=True)
+                results.append({
+                    "sequence": sequence,
+                    "labels": [label for label, _ in ranked],
+                    "scores": [score for _, score in ranked],
+                })
+        return results[0] if single else results
+
+class EmbeddingZeroShotClassifier:
+    """Zero-shot classifier comparing one text embedding against precomputed label anchors
+    
+    Each call costs a single encoder forward plus a (num_labels, dim) matrix-vector product,
+    instead of one cross-encoder pass per label. Returns the zero-shot pipeline's dict format,
+    or a list of them when given a list of texts.
+    """
+    
+    def __init__(self, model):
+        self.model = model
+        self._anchors = functools.lru_cache(maxsize=32)(self._encode_labels)
+    
+    def _encode_labels(self, labels: tuple) -> np.ndarray:
+        anchors = self.model.encode(list(labels), convert_to_numpy=True, normalize_embeddings=True)
+        return np.ascontiguousarray(anchors, dtype=np.float32)
+    
+    def __call__(self, sequences, candidate_labels, batch_size: int = 32):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        labels = tuple(candidate_labels)
+        queries = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        similarities = queries.astype(np.float32, copy=False) @ self._anchors(labels).T
+        
+        logits = similarities * SIMILARITY_SCALE
+        scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+        scores /= scores.sum(axis=1, keepdims=True)
+        results = []
+        for sequence, row in zip(texts, scores):
+            order = np.argsort(-row, kind="stable")
+            results.append({
+                "sequence": sequence,
+                "labels": [labels[i] for i in order],
+                "scores": [float(row[i]) for i in order],
+            })
+        return results[0] if single else results
+
+def _cpu_supports_vnni() -> bool:
+    """Whether the CPU advertises AVX512-VNNI int8 dot-product instructions (Linux only)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            return any(line.startswith("flags") and "avx512_vnni" in line.split() for line in f)
+    except OSError:
+        return False
+
+def _quantize_onnx_static(tokenizer) -> None:
+    """Calibrate and statically quantize the exported ONNX model to INT8"""
+    from datasets import Dataset
+    
+    premises = [text for text in CALIBRATION_SYMPTOMS for _ in MEDICAL_CATEGORIES]
+    hypotheses = [HYPOTHESIS_TEMPLATE.format(label) for _ in CALIBRATION_SYMPTOMS for label in MEDICAL_CATEGORIES]
+    encoded = tokenizer(premises, hypotheses, padding="max_length", truncation=True, max_length=MAX_LENGTH)
+    calibration_dataset = Dataset.from_dict(dict(encoded))
+    
+    quantizer = ORTQuantizer.from_pretrained(ONNX_ZERO_SHOT_DIR, file_name="model.onnx")
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=True, per_channel=True)
+    calibration_config = AutoCalibrationConfig.minmax(calibration_dataset)
+    ranges = quantizer.fit(
+        dataset=calibration_dataset,
+        calibration_config=calibration_config,
+        operators_to_quantize=qconfig.operators_to_quantize,
+    )
+    quantizer.quantize(
+        save_dir=ONNX_ZERO_SHOT_DIR,
+        quantization_config=qconfig,
+        calibration_tensors_range=ranges,
+    )
+
+def _load_onnx_zero_shot():
+    """Zero-shot pipeline over the ONNX model, exporting and quantizing on first use
+    
+    Static INT8 is only used on CPUs with AVX512-VNNI; elsewhere the FP32 graph is faster.
+    """
+    if not os.path.exists(os.path.join(ONNX_ZERO_SHOT_DIR, "model.onnx")):
+        ORTModelForSequenceClassification.from_pretrained(ZERO_SHOT_MODEL, export=True).save_pretrained(ONNX_ZERO_SHOT_DIR)
+        AutoTokenizer.from_pretrained(ZERO_SHOT_MODEL).save_pretrained(ONNX_ZERO_SHOT_DIR)
+    
+    tokenizer = AutoTokenizer.from_pretrained(ONNX_ZERO_SHOT_DIR)
+    file_name = "model.onnx"
+    if _cpu_supports_vnni():
+        file_name = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(ONNX_ZERO_SHOT_DIR, file_name)):
+            _quantize_onnx_static(tokenizer)
+    
+    # Full graph optimizations (operator fusion, constant folding) on the CPU execution provider
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    model = ORTModelForSequenceClassification.from_pretrained(
+        ONNX_ZERO_SHOT_DIR,
+        file_name=file_name,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+    )
+    return NLIZeroShotClassifier(model, tokenizer)
+
+def _compile_nli(pipe):
+    """Wrap the PyTorch NLI model with Inductor; the first forward (the warm-up) compiles it"""
+    try:
+        pipe.eager_model = pipe.model
+        pipe.model = torch.compile(pipe.eager_model, backend="inductor", dynamic=False)
+        pipe.pad_to_max_length = True
+    except Exception as e:
+        pipe.model, pipe.pad_to_max_length, pipe.eager_model = pipe.eager_model, False, None
+        print(f"⚠️  torch.compile unavailable, using eager PyTorch: {e}")
+    return pipe
 
 # Initialize the zero-shot classification pipeline
 def create_zero_shot_classifier():
     """Create a zero-shot classification pipeline using a smaller model"""
+    if ZERO_SHOT_BACKEND == "embedding":
+        try:
+            from sentence_transformers import SentenceTransformer
+            pipe = EmbeddingZeroShotClassifier(SentenceTransformer(EMBEDDING_MODEL))
+            print(f"✅ Zero-shot classifier ({EMBEDDING_MODEL}, embedding anchors) loaded successfully")
+            return pipe
+        except Exception as e:
+            print(f"⚠️  Embedding zero-shot classifier unavailable, using NLI: {e}")
+    
+    if OPTIMUM_AVAILABLE:
+        try:
+            pipe = _load_onnx_zero_shot()
+            print(f"✅ Zero-shot classifier ({ZERO_SHOT_MODEL}, ONNX) loaded successfully")
+            return pipe
+        except Exception as e:
+            print(f"⚠️  ONNX zero-shot classifier unavailable, using PyTorch: {e}")
+    
     try:
-        # Try with a smaller, more memory-efficient model first
-        pipe = pipeline("zero-shot-classification", model="microsoft/DialoGPT-medium")
-        print("✅ Zero-shot classifier (DialoGPT) loaded successfully")
+        # Try with a smaller, more memory-efficient model first. low_cpu_mem_usage builds the model
+        # on the meta device and loads weights straight into it, avoiding a second full copy at load.
+        tokenizer = AutoTokenizer.from_pretrained(ZERO_SHOT_MODEL)
+        if torch.cuda.is_available():
+            # FP16 weights loaded straight onto the GPU, without staging an FP32 copy in host RAM
+            model = AutoModelForSequenceClassification.from_pretrained(
+                ZERO_SHOT_MODEL, torch_dtype=torch.float16, low_cpu_mem_usage=True, device_map={"": 0}
+            ).eval()
+            pipe = _compile_nli(NLIZeroShotClassifier(model, tokenizer))
+        else:
+            model = AutoModelForSequenceClassification.from_pretrained(ZERO_SHOT_MODEL, low_cpu_mem_usage=True).eval()
+            # INT8 weights with dynamically quantized activations for the encoder's Linear layers.
+            # Not compiled: Inductor does not lower the dynamic-quantized Linear ops.
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            pipe = NLIZeroShotClassifier(model, tokenizer)
+        print(f"✅ Zero-shot classifier ({ZERO_SHOT_MODEL}) loaded successfully")
         return pipe
     except Exception as e1:
         try:
             # Fallback to an even smaller model
-            pipe = pipeline("text-classification", model="distilbert-base-uncased-finetuned-sst-2-english")
+            pipe = pipeline(
+                "text-classification",
+                model="distilbert-base-uncased-finetuned-sst-2-english",
+                device=0 if torch.cuda.is_available() else -1,
+            )
             print("✅ Fallback text classifier loaded successfully")
             return pipe
         except Exception as e2:
@@ -24,8 +309,39 @@ def create_zero_shot_classifier():
             print(f"❌ Fallback also failed: {e2}")
             return None
 
-# Medical symptom categories for classification
-MEDICAL_CATEGORIES = [
+def _warm_up(pipe) -> None:
+    """One throwaway classification to warm tokenizer caches and ONNX/compiled graph state"""
+    try:
+        pipe("warm-up", MEDICAL_CATEGORIES)
+        if getattr(pipe, "eager_model", None) is not None:
+            pipe.eager_model = None  # The compiled graph works; no fallback needed any more
+    except Exception as e:
+        if getattr(pipe, "eager_model", None) is None:
+            print(f"⚠️  Zero-shot warm-up failed: {e}")
+            return
+        # torch.compile compiles on the first forward; if that fails, serve the eager model instead
+        print(f"⚠️  torch.compile unavailable, using eager PyTorch: {e}")
+        with pipe._lock:
+            pipe.model, pipe.pad_to_max_length, pipe.eager_model = pipe.eager_model, False, None
+        _warm_up(pipe)
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_classifier():
+    """Shared zero-shot classifier, created on first use rather than at import"""
+    global _classifier
+    with _classifier_lock:
+        # Only a successful load is kept; after a failed one (download error, OOM) the next call retries
+        if _classifier is None:
+            _classifier = create_zero_shot_classifier()
+            if isinstance(_classifier, (NLIZeroShotClassifier, EmbeddingZeroShotClassifier)):
+                # Warm up off the caller's thread so the first real request doesn't pay for it
+                threading.Thread(target=_warm_up, args=(_classifier,), name="zero-shot-warmup", daemon=True).start()
+        return _classifier
+
+# Medical symptom categories for classification (immutable, interned: hashed and compared by identity)
+MEDICAL_CATEGORIES = tuple(sys.intern(category) for category in [
     "respiratory symptoms",
     "cardiovascular symptoms", 
     "gastrointestinal symptoms",
@@ -38,10 +354,28 @@ MEDICAL_CATEGORIES = [
     "gynecological symptoms",
     "emergency symptoms",
     "chronic pain symptoms"
-]
+])
+
+@functools.lru_cache(maxsize=4096)
+def _classify_cached(pipe, symptoms_text: str, categories: tuple) -> tuple:
+    """Ranked (labels, scores) for a text; repeated texts skip inference entirely"""
+    result = pipe(symptoms_text, categories)
+    return tuple(result["labels"]), tuple(result["scores"])
+
+def _format_classification(labels, scores, top_k: int) -> dict:
+    """Best label plus the top_k (label, score) pairs"""
+    # The classifiers already rank labels by descending score, so the top-k is a slice
+    top_k = max(1, top_k)
+    return {
+        "classification": labels[0],
+        "confidence": float(scores[0]),
+        "top_k": [(label, float(score)) for label, score in zip(labels[:top_k], scores[:top_k])]
+    }
 
-def classify_symptoms(pipe, symptoms_text, categories=None):
-    """Classify symptoms using zero-shot classification"""
+def classify_symptoms(pipe, symptoms_text, categories=None, top_k: int = 3):
+    """Classify symptoms using zero-shot classification (pipe=None uses the shared classifier)"""
+    if pipe is None:
+        pipe = get_classifier()
     if pipe is None:
         return {"error": "Classifier not available"}
     
@@ -49,44 +383,66 @@ def classify_symptoms(pipe, symptoms_text, categories=None):
         categories = MEDICAL_CATEGORIES
     
     try:
-        result = pipe(symptoms_text, categories)
-        return {
-            "classification": result["labels"][0],
-            "confidence": result["scores"][0],
-            "all_scores": dict(zip(result["labels"], result["scores"]))
-        }
+        labels, scores = _classify_cached(pipe, symptoms_text, tuple(categories))
+        return _format_classification(labels, scores, top_k)
     except Exception as e:
         return {"error": f"Classification failed: {e}"}
 
+def classify_symptoms_batch(pipe, symptom_texts, categories=None, top_k: int = 3):
+    """Classify several symptom descriptions with one batched classifier call"""
+    if pipe is None:
+        pipe = get_classifier()
+    if pipe is None:
+        return [{"error": "Classifier not available"} for _ in symptom_texts]
+    
+    if categories is None:
+        categories = MEDICAL_CATEGORIES
+    
+    try:
+        results = pipe(list(symptom_texts), categories)
+        return [_format_classification(result["labels"], result["scores"], top_k) for result in results]
+    except Exception as e:
+        return [{"error": f"Classification failed: {e}"} for _ in symptom_texts]
+
 # Example usage and test
 if __name__ == "__main__":
+    import httpx
+    
     print("🔧 Testing Zero-Shot Classification for Medical Symptoms")
     print("=" * 60)
     
-    # Create classifier
-    classifier = create_zero_shot_classifier()
-    
-    if classifier:
-        # Test with sample symptoms
-        test_symptoms = [
-            "I have been experiencing chest pain and shortness of breath",
-            "Severe headache with nausea and vision problems", 
-            "Persistent cough with fever and fatigue",
-            "Stomach pain with vomiting and diarrhea"
-        ]
+    # Test with sample symptoms
+    test_symptoms = [
+        "I have been experiencing chest pain and shortness of breath",
+        "Severe headache with nausea and vision problems", 
+        "Persistent cough with fever and fatigue",
+        "Stomach pain with vomiting and diarrhea"
+    ]
+    
+    # Prefer the running backend's warm classifier; only load the model here if it is not up
+    try:
+        with httpx.Client(timeout=30) as client:
+            results = []
+            for symptoms in test_symptoms:
+                response = client.post(CLASSIFY_URL, json={"symptoms": symptoms})
+                response.raise_for_status()
+                results.append(response.json())
+        print(f"🌐 Using the backend classifier at {CLASSIFY_URL}")
+    except httpx.HTTPError as e:
+        print(f"⚠️  Backend classifier unavailable ({e}), loading locally")
+        results = classify_symptoms_batch(get_classifier(), test_symptoms)
+    
+    for i, (symptoms, result) in enumerate(zip(test_symptoms, results), 1):
+        print(f"\n🧪 Test {i}: {symptoms}")
         
-        for i, symptoms in enumerate(test_symptoms, 1):
-            print(f"\n🧪 Test {i}: {symptoms}")
-            result = classify_symptoms(classifier, symptoms)
-            
-            if "error" not in result:
-                print(f"📊 Primary Category: {result['classification']}")
-                print(f"🎯 Confidence: {result['confidence']:.2%}")
-                print("📈 Top 3 Categories:")
-                for label, score in list(result['all_scores'].items())[:3]:
-                    print(f"   • {label}: {score:.2%}")
-            else:
-                print(f"❌ Error: {result['error']}")
+        if "error" not in result:
+            print(f"📊 Primary Category: {result['classification']}")
+            print(f"🎯 Confidence: {result['confidence']:.2%}")
+            print("📈 Top 3 Categories:")
+            for label, score in result['top_k']:
+                print(f"   • {label}: {score:.2%}")
+        else:
+            print(f"❌ Error: {result['error']}")
     
     print("\n" + "=" * 60)
     print("Zero-shot classification test complete!")
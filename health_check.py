@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 """Quick health check for the MedAI Advanced system"""
 
+import os
+import sys
 import requests
-import json
+
+# Shared session, JSON codec and analyze helper live in backend/_probe.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from _probe import BASE_URL, SESSION, loads, post_symptoms
+
+# /health answers with a few hundred bytes; the probe never reads more than this
+HEALTH_MAX_BYTES = 4096
 
 def health_check():
     """Check system health and model status"""
@@ -12,25 +20,23 @@ def health_check():
         print("=" * 50)
         
         # Check backend health
-        health_response = requests.get("http://localhost:8000/health", timeout=10)
+        with SESSION.get(f"{BASE_URL}/health", stream=True, timeout=5) as health_response:
+            healthy = health_response.status_code == 200
+            # Only read (a bounded chunk of) the body once the status code says it is worth parsing
+            health_data = loads(health_response.raw.read(HEALTH_MAX_BYTES, decode_content=True)) if healthy else None
         
-        if health_response.status_code == 200:
-            health_data = health_response.json()
+        if healthy:
             print("✅ Backend Status: HEALTHY")
             print(f"🤖 Models Loaded: {health_data.get('models_loaded', 'Unknown')}")
             print(f"📊 System Status: {health_data.get('status', 'Unknown')}")
             
             # Test a quick analysis
             print("\n🧪 Testing Quick Analysis...")
-            test_response = requests.post(
-                "http://localhost:8000/analyze-symptoms",
-                json={"symptoms": "mild headache"},
-                timeout=15
-            )
+            test_response = post_symptoms("mild headache", timeout=15)
             
             if test_response.status_code == 200:
                 print("✅ Analysis Endpoint: WORKING")
-                result = test_response.json()
+                result = loads(test_response.content)
                 print(f"🔬 Entities Found: {len(result.get('entities_extracted', []))}")
                 print(f"⚡ Urgency Score: {result.get('urgency_score', 'N/A')}")
             else:
@@ -39,6 +45,8 @@ def health_check():
         else:
             print("❌ Backend Status: UNHEALTHY")
             
+    except ValueError:
+        print("❌ Backend Status: UNHEALTHY (invalid health response)")
     except requests.exceptions.RequestException as e:
         print("❌ Cannot connect to backend")
         print("Make sure to run: python backend/main_advanced_models.py")
@@ -1,29 +1,33 @@
 #!/usr/bin/env python3
 """Test script to verify frontend-backend integration"""
 
+import asyncio
+import time
+import httpx
+import os
+import sys
 import requests
-import json
+
+# Shared session, JSON codec and analyze helper live in backend/_probe.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from _probe import ANALYZE_URL, JSON_HEADERS, dumps, loads, post_symptoms
 
 def test_api_integration():
     """Test the API endpoint that the frontend uses"""
     
-    url = "http://localhost:8000/analyze-symptoms"
+    url = ANALYZE_URL
     test_symptoms = "I have been experiencing headaches and fatigue for the past few days"
     
-    payload = {
-        "symptoms": test_symptoms
-    }
-    
     try:
         print("🧪 Testing API integration...")
         print(f"📍 URL: {url}")
         print(f"📝 Symptoms: {test_symptoms}")
         print("=" * 60)
         
-        response = requests.post(url, json=payload, timeout=30)
+        response = post_symptoms(test_symptoms, timeout=30)
         
         if response.status_code == 200:
-            data = response.json()
+            data = loads(response.content)
             print("✅ API Request Successful!")
             print("=" * 60)
             
@@ -52,5 +56,39 @@ def test_api_integration():
         print(f"❌ Connection Error: {e}")
         print("Make sure the backend is running on http://localhost:8000")
 
+async def post_symptoms_concurrently(texts, url=ANALYZE_URL):
+    """POST every symptom text at once over a shared connection pool; responses keep input order"""
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=16), timeout=30) as client:
+        return await asyncio.gather(
+            *(client.post(url, content=dumps({"symptoms": text}), headers=JSON_HEADERS) for text in texts),
+            return_exceptions=True,
+        )
+
+def test_concurrent_integration():
+    """Send several symptom descriptions concurrently and summarize each response"""
+    test_symptoms = [
+        "I have been experiencing headaches and fatigue for the past few days",
+        "Persistent cough with fever and shortness of breath since yesterday",
+        "Sharp stomach pain on the lower right side with nausea",
+        "Itchy red rash spreading across both arms after gardening",
+    ]
+    
+    print("🧪 Testing concurrent API requests...")
+    start = time.perf_counter()
+    responses = asyncio.run(post_symptoms_concurrently(test_symptoms))
+    elapsed = time.perf_counter() - start
+    
+    for symptoms, response in zip(test_symptoms, responses):
+        if isinstance(response, Exception):
+            print(f"❌ {symptoms[:40]}... -> Connection Error: {response}")
+        elif response.status_code == 200:
+            data = loads(response.content)
+            print(f"✅ {symptoms[:40]}... -> {data.get('severity', 'N/A')} (urgency {data.get('urgency_score', 'N/A')}/10)")
+        else:
+            print(f"❌ {symptoms[:40]}... -> API Error: {response.status_code}")
+    
+    print(f"⏱️  {len(test_symptoms)} requests completed in {elapsed:.2f}s")
+
 if __name__ == "__main__":
     test_api_integration()
+    test_concurrent_integration()